@@ -0,0 +1,21 @@
+{#
+    Deletes rows derived from document versions that were removed or replaced on the stage.
+    A tombstoned (path, md5) that is still on the stage is live content re-uploaded with identical bytes:
+    its rows keep the old last_modified because they were never rebuilt, so they are left alone.
+#}
+
+{% macro apply_document_tombstones(relation) -%}
+    delete from {{ relation }} t
+    using (
+        select ts.relative_path, ts.md5, ts.last_modified
+        from {{ ref('document_tombstones') }} ts
+        where not exists (
+            select 1 from {{ ref('v_staged_documents') }} sd
+            where sd.relative_path = ts.relative_path
+            and sd.md5 = ts.md5
+        )
+    ) ts
+    where t.relative_path = ts.relative_path
+    and t.md5 = ts.md5
+    and t.last_modified <= ts.last_modified
+{%- endmacro %}
@@ -0,0 +1,43 @@
+{#
+    on-run-end hook that advances the per channel Slack high-water mark.
+    slack_channel_watermarks only proposes the (low_ingestts, high_ingestts] window; the mark moves to
+    high_ingestts once that model and every model downstream of it that ran in this invocation succeeded.
+    A failed or skipped consumer leaves the mark in place, so the retried run re-processes the window.
+#}
+
+{% macro slack_channel_watermark_consumers(watermark_id) -%}
+    {%- set consumers = [watermark_id] -%}
+    {#- Walks the graph one level per pass; the lineage is far shallower than the bound -#}
+    {%- for _ in range(25) -%}
+        {%- for node in graph.nodes.values() -%}
+            {%- if node.unique_id not in consumers and node.depends_on.nodes | select('in', consumers) | list | length > 0 -%}
+                {%- do consumers.append(node.unique_id) -%}
+            {%- endif -%}
+        {%- endfor -%}
+    {%- endfor -%}
+    {{ return(consumers) }}
+{%- endmacro %}
+
+
+{% macro commit_slack_channel_watermarks(results) -%}
+    {%- if execute -%}
+        {%- set watermark_results = results | selectattr('node.name', 'equalto', 'slack_channel_watermarks') | list -%}
+        {%- if watermark_results and watermark_results[0].status == 'success' -%}
+            {%- set consumers = slack_channel_watermark_consumers(watermark_results[0].node.unique_id) -%}
+            {%- set unsuccessful = results
+                | selectattr('node.unique_id', 'in', consumers)
+                | rejectattr('status', 'in', ['success', 'pass'])
+                | list -%}
+            {%- if unsuccessful | length == 0 -%}
+                {%- do run_query(
+                    "update " ~ ref('slack_channel_watermarks') ~ "
+                    set watermark_ingestts = high_ingestts, watermark_ts = high_ts
+                    where not is_backfill
+                    and high_ingestts is not null"
+                ) -%}
+            {%- else -%}
+                {{ log('Slack channel watermarks not advanced: ' ~ (unsuccessful | map(attribute='node.name') | join(', ')) ~ ' did not succeed', info=True) }}
+            {%- endif -%}
+        {%- endif -%}
+    {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,11 @@
+{#
+    Shared document classification, used by v_qualify_new_documents and v_staged_documents.
+#}
+
+{% macro document_type(relative_path) -%}
+    case 
+        when contains({{ relative_path }}, 'qa') then 'question'
+        when contains({{ relative_path }}, 'full') then 'full'
+        else 'slack'
+    end
+{%- endmacro %}
@@ -0,0 +1,9 @@
+{#
+    Latest change of an incidents row. processed_at is set by the dbt incidents merge; status writers outside
+    dbt (closing, resolving or reassigning an incident) do not touch it and must set updated_at (and closed_at
+    when closing) to the current time instead, so every change moves at least one of the three columns.
+#}
+
+{% macro incident_changed_at(incident_alias) -%}
+    greatest_ignore_nulls({{ incident_alias }}.processed_at, {{ incident_alias }}.updated_at, {{ incident_alias }}.closed_at)
+{%- endmacro %}
@@ -0,0 +1,22 @@
+{#
+    Incident classification labels and priorities, driven by the incident_categories and
+    incident_priorities project vars. Adding a label changes the prompt, not the number of LLM calls.
+#}
+
+{% macro classify_incident(input) -%}
+    ai_classify({{ input }}, [
+        {%- for category in var('incident_categories') -%}
+            '{{ category }}'{% if not loop.last %}, {% endif %}
+        {%- endfor -%}
+    ]):labels[0]::string
+{%- endmacro %}
+
+
+{% macro incident_priority(category) -%}
+    case {{ category }}
+        {%- for category_label, priority in var('incident_priorities').items() %}
+        when '{{ category_label }}' then '{{ priority }}'
+        {%- endfor %}
+        else '{{ var("default_incident_priority") }}'
+    end
+{%- endmacro %}
@@ -0,0 +1,65 @@
+{#
+    Prompts and model used to extract incident codes from Slack messages.
+    Any change here changes incident_extraction_hash(), which marks earlier extractions as stale.
+#}
+
+{% macro incident_extraction_prompt(kind) -%}
+{%- if kind == 'image' -%}
+            Find the incident number that may be present either in the image {0} or in the text {1}.
+            Use the one in the image if found.Look for alphanumeric codes preceded by the keyword 'incident' (case-insensitive).
+            Examples: INC-12345, incident_001, INC-2025-001.
+            Respond only in JSON format with a single key called 'incident_code'.
+            Do not add any explanation in the response.
+{%- else -%}
+                Extract incident codes from Slack text {0}.
+                Look for alphanumeric codes preceded by the keyword 'incident' (case-insensitive).
+                Examples: INC-12345, incident_001, INC-2025-001.
+                Respond only in JSON format with a single key called 'incident_code'.
+                Do not add any explanation in the response.
+{%- endif -%}
+{%- endmacro %}
+
+
+{% macro incident_extraction_hash() -%}
+    sha2($${{ var("incident_extraction_model") }}|{{ var("incident_code_pattern") }}|{{ incident_extraction_prompt('image') }}|{{ incident_extraction_prompt('text') }}$$, 256)
+{%- endmacro %}
+
+
+{% macro incident_code_from_text(text) -%}
+    upper(regexp_substr({{ text }}, '{{ var("incident_code_pattern") }}', 1, 1, 'ie', 2))
+{%- endmacro %}
+
+
+{# Existing incident numbers are not rewritten; slack_message_incidents matches codes to them case-insensitively #}
+{% macro incident_normalized_code(incident_number) -%}
+    upper(parse_json({{ incident_number }}):incident_code::string)
+{%- endmacro %}
+
+
+{% macro incident_extraction_tier(hasfiles, attachment_file, text, regex_incident_code) -%}
+    case 
+        when {{ attachment_file }} is not null and fl_is_image({{ attachment_file }}) then 'llm_image'
+        when {{ regex_incident_code }} is not null then 'regex'
+        when not coalesce({{ hasfiles }}, false) and {{ text }} is not null then 'llm_text'
+        else 'unresolved'
+    end
+{%- endmacro %}
+
+
+{% macro incident_extraction_result(extraction_tier, attachment_file, text, regex_incident_code) -%}
+    case 
+        -- When there is an attachment file and it is an image, use the image to extract the incident code
+        -- TODO: Add structured response
+        when {{ extraction_tier }} = 'llm_image' then 
+            ai_complete('{{ var("incident_extraction_model") }}',
+                prompt($${{ incident_extraction_prompt('image') }}$$, {{ attachment_file }}, {{ text }})
+            )
+        when {{ extraction_tier }} = 'regex' then to_json(object_construct('incident_code', {{ regex_incident_code }}))
+        -- Only use text to extract the incident code since there are no attachments
+        when {{ extraction_tier }} = 'llm_text' then 
+            ai_complete('{{ var("incident_extraction_model") }}',
+                prompt($${{ incident_extraction_prompt('text') }}$$, {{ text }})
+            )
+        else null
+    end
+{%- endmacro %}
@@ -0,0 +1,30 @@
+{#
+    CTEs shared by the incremental incident trend rollups.
+    Yields bucket_incidents: the incidents of every bucket (by created_at) touched by an incident
+    changed since the last refresh, or of all buckets on a full refresh. Rollups store the latest
+    incident_changed_at of the bucket as source_changed_at, which serves as the watermark, so buckets
+    are recounted both for late-ingested messages with an older ts and for status changes made outside dbt.
+    A rollup created before the watermark column existed is recomputed in full once.
+#}
+
+{% macro incident_trend_buckets(grain) -%}
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['source_changed_at']) %}
+{% if has_watermark %}
+touched_buckets as (
+    select distinct date_trunc('{{ grain }}', created_at) as bucket
+    from {{ ref('incidents') }} i
+    where {{ incident_changed_at('i') }} > (select coalesce(max(source_changed_at), '1970-01-01'::timestamp_tz) from {{ this }})
+),
+{% endif %}
+bucket_incidents as (
+    select 
+        i.*,
+        {{ incident_changed_at('i') }} as changed_at,
+        date_trunc('{{ grain }}', i.created_at) as bucket
+    from {{ ref('incidents') }} i
+    {% if has_watermark %}
+    where i.created_at >= (select min(bucket) from touched_buckets)
+    and date_trunc('{{ grain }}', i.created_at) in (select bucket from touched_buckets)
+    {% endif %}
+)
+{%- endmacro %}
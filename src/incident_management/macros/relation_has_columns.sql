@@ -0,0 +1,11 @@
+{#
+    True when the existing relation already has every column in column_names.
+    Incremental models use it to skip watermark reads against {{ this }} on deployments whose
+    table predates the column; on_schema_change adds it only after the model SQL has run.
+#}
+
+{% macro relation_has_columns(relation, column_names) -%}
+    {%- set existing = adapter.get_columns_in_relation(relation) | map(attribute='name') | map('upper') | list -%}
+    {%- set missing = column_names | map('upper') | reject('in', existing) | list -%}
+    {{ return(missing | length == 0) }}
+{%- endmacro %}
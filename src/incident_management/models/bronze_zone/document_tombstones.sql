@@ -0,0 +1,20 @@
+{{
+    config(
+        materialized='incremental'
+        , incremental_strategy='append'
+        , description='Deleted and replaced document versions captured from the documents stage'
+        , tags=['document_processing']
+    )
+}}
+
+-- A deleted file shows up as a DELETE row; a replaced file as a DELETE row with METADATA$ISUPDATE
+-- followed by an INSERT of the new version. Each DELETE row tombstones exactly one (path, md5) version.
+select
+    relative_path,
+    md5,
+    last_modified,
+    METADATA$ISUPDATE as is_update,
+    current_timestamp() as recorded_at
+from {{ source('bronze_zone', 'documents_tombstone_stream') }}
+where METADATA$ACTION = 'DELETE'
+and relative_path is not null
@@ -0,0 +1,79 @@
+{{
+    config(
+        materialized='incremental'
+        , incremental_strategy='merge'
+        , unique_key='channel'
+        , on_schema_change='append_new_columns'
+        , description='Per channel ingestion window of Slack messages to qualify in the current run, driven by a high-water mark'
+        , tags=['daily']
+    )
+}}
+
+-- One row per channel holding the (low_ingestts, high_ingestts] window processed by the current run.
+-- Windows start at the committed high-water mark (watermark_ingestts), which this model never moves:
+-- the commit_slack_channel_watermarks on-run-end hook advances it to high_ingestts only after the
+-- models consuming the window succeeded, so a failed run is retried over the same window.
+-- Setting slack_backfill_start (and optionally slack_backfill_end) re-processes that window instead,
+-- leaving the high-water mark untouched.
+with previous_watermarks as (
+    {% if is_incremental() %}
+    select channel, low_ingestts, watermark_ingestts, watermark_ts
+    from {{ this }}
+    {% else %}
+    select 
+        null::varchar as channel, 
+        null::timestamp_ntz as low_ingestts, 
+        null::timestamp_ntz as watermark_ingestts, 
+        null::timestamp_ntz as watermark_ts
+    where false
+    {% endif %}
+)
+
+, new_messages as (
+    select 
+        sm.channel,
+        max(sm.ingestts) as high_ingestts,
+        max(sm.ts) as high_ts
+    from {{ source('bronze_zone', 'slack_messages') }} sm
+    left join previous_watermarks pw on sm.channel = pw.channel
+    {% if var('slack_backfill_start') %}
+    where sm.ingestts > '{{ var("slack_backfill_start") }}'::timestamp_ntz
+    {% if var('slack_backfill_end') %}
+    and sm.ingestts <= '{{ var("slack_backfill_end") }}'::timestamp_ntz
+    {% endif %}
+    {% else %}
+    where sm.ingestts > coalesce(
+        pw.watermark_ingestts, 
+        pw.low_ingestts,
+        dateadd('day', -{{ var('slack_initial_lookback_days') }}, to_date(current_timestamp()))::timestamp_ntz
+    )
+    {% endif %}
+    group by sm.channel
+)
+
+-- Channels without new messages get an empty window so they are not re-processed
+select 
+    coalesce(nm.channel, pw.channel) as channel,
+    {% if var('slack_backfill_start') %}
+    '{{ var("slack_backfill_start") }}'::timestamp_ntz as low_ingestts,
+    nm.high_ingestts,
+    nm.high_ts,
+    pw.watermark_ingestts,
+    pw.watermark_ts,
+    true as is_backfill,
+    {% else %}
+    -- A channel with no committed mark yet keeps its first window start until the first commit
+    coalesce(
+        pw.watermark_ingestts, 
+        pw.low_ingestts,
+        dateadd('day', -{{ var('slack_initial_lookback_days') }}, to_date(current_timestamp()))::timestamp_ntz
+    ) as low_ingestts,
+    coalesce(nm.high_ingestts, pw.watermark_ingestts) as high_ingestts,
+    coalesce(nm.high_ts, pw.watermark_ts) as high_ts,
+    pw.watermark_ingestts,
+    pw.watermark_ts,
+    false as is_backfill,
+    {% endif %}
+    current_timestamp() as run_at
+from new_messages nm
+full outer join previous_watermarks pw on nm.channel = pw.channel
@@ -0,0 +1,73 @@
+{{
+    config(
+        materialized='incremental'
+        , incremental_strategy='append'
+        , description='Append-only log of incident number extractions per Slack message, file and prompt/model version'
+        , tags=['daily']
+    )
+}}
+
+-- Each (message, file) is sent to the LLM once per extraction hash.
+-- Changing the prompts, model or regex changes the hash; rows extracted under an older hash
+-- are re-extracted from this table in batches of extraction_backfill_limit (0 disables the backfill).
+with pending as (
+    select 
+        c.slack_message_id,
+        c.file_id,
+        c.hasfiles,
+        c.staged_file_path,
+        c.text
+    from {{ ref('v_slack_message_candidates') }} c
+    {% if is_incremental() %}
+    where not exists (
+        select 1 
+        from {{ this }} e
+        where e.slack_message_id = c.slack_message_id
+        and equal_null(e.file_id, c.file_id)
+        and e.extraction_hash = {{ incident_extraction_hash() }}
+    )
+    {% endif %}
+)
+
+{% if is_incremental() and var('extraction_backfill_limit') | int > 0 %}
+, stale as (
+    select 
+        e.slack_message_id,
+        e.file_id,
+        e.hasfiles,
+        e.staged_file_path,
+        e.text
+    from {{ this }} e
+    qualify max(iff(e.extraction_hash = {{ incident_extraction_hash() }}, 1, 0)) over (partition by e.slack_message_id, e.file_id) = 0
+    and row_number() over (partition by e.slack_message_id, e.file_id order by e.extracted_at desc) = 1
+    order by e.extracted_at desc
+    limit {{ var('extraction_backfill_limit') | int }}
+)
+{% endif %}
+
+, to_extract as (
+    select 
+        p.*,
+        case when p.staged_file_path is not null then to_file('{{ var("docs_stage_path") }}', p.staged_file_path) end as attachment_file,
+        {{ incident_code_from_text('p.text') }} as regex_incident_code
+    from (
+        select * from pending
+        {% if is_incremental() and var('extraction_backfill_limit') | int > 0 %}
+        union
+        select * from stale
+        {% endif %}
+    ) p
+)
+
+select 
+    slack_message_id,
+    file_id,
+    hasfiles,
+    staged_file_path,
+    text,
+    {{ incident_extraction_tier('hasfiles', 'attachment_file', 'text', 'regex_incident_code') }} as extraction_tier,
+    {{ incident_extraction_result('extraction_tier', 'attachment_file', 'text', 'regex_incident_code') }} as incident_number,
+    {{ incident_extraction_hash() }} as extraction_hash,
+    '{{ var("incident_extraction_model") }}' as extraction_model,
+    current_timestamp() as extracted_at
+from to_extract
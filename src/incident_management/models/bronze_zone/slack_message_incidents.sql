@@ -0,0 +1,157 @@
+{{
+    config(
+        materialized='incremental'
+        , incremental_strategy='append'
+        , description='Incident assigned to each qualified Slack message, by extracted code, match to an open incident or a new incident number'
+        , tags=['daily']
+    )
+}}
+
+-- One row per qualified message and attachment, assigned once: messages already mapped are skipped,
+-- so re-processing a window neither re-matches them nor draws a new random incident number.
+-- incidents and incident_comment_history both read their incident numbers from here.
+with 
+
+-- Read as a source rather than a ref because incidents is built from this model
+recent_open_incidents as (
+    select * from {{ source('gold_zone', 'incidents') }}
+    where lower(status) = 'open' 
+    and reportee_id is not null
+    and created_at > dateadd('day', -7, current_timestamp())
+)
+
+, new_slack_messages as (
+    select 
+        lh.*
+    from {{ref('v_qualify_slack_messages')}} lh 
+    {% if is_incremental() %}
+    where not exists (
+        select 1 from {{ this }} t 
+        where t.slack_message_id = lh.slack_message_id 
+        and equal_null(t.file_id, lh.file_id)
+    )
+    {% endif %}
+)
+
+-- Classify each message once (attachment if present, otherwise text);
+-- the label is reused for incident matching, category, title and priority
+, classified_slack_messages as (
+    select 
+        *,
+        case 
+            when attachment_file is not null then {{ classify_incident('attachment_file') }}
+            else {{ classify_incident('text') }}
+        end as category
+    from new_slack_messages
+)
+
+-- Incidents stored before codes were normalized may have mixed case numbers; codes resolve to the stored
+-- number case-insensitively so they update that incident instead of opening an upper case duplicate
+-- (min prefers the upper case spelling when both exist)
+, existing_incident_numbers as (
+    select 
+        upper(incident_number) as normalized_incident_number,
+        min(incident_number) as incident_number
+    from {{ source('gold_zone', 'incidents') }}
+    group by 1
+)
+
+-- Split messages based on whether they have valid incident codes
+, messages_with_incident_code as (
+    select 
+        cm.* exclude(incident_number),
+        -- New codes are stored upper case so INC-2025-001 and inc-2025-001 are the same incident
+        coalesce(ei.incident_number, {{ incident_normalized_code('cm.incident_number') }}) as incident_number
+    from classified_slack_messages cm
+    left join existing_incident_numbers ei 
+    on ei.normalized_incident_number = {{ incident_normalized_code('cm.incident_number') }}
+    where not IS_NULL_VALUE(parse_json(cm.incident_number):incident_code)
+)
+
+, messages_without_incident_code as (
+    select 
+        * exclude(incident_number),
+        '' as incident_number
+    from classified_slack_messages
+    where IS_NULL_VALUE(parse_json(incident_number):incident_code)
+)
+
+-- For messages without incident codes, try to find existing incidents.
+-- Candidates come from an equality join on category, channel and reportee,
+-- and the LLM is only asked to break ties when several open incidents qualify
+, incident_candidates as (
+    select 
+        sm.slack_message_id,
+        sm.file_id,
+        sm.text,
+        roi.incident_number,
+        roi.last_comment,
+        roi.created_at,
+        count(*) over (partition by sm.slack_message_id, sm.file_id) as candidate_count
+    from messages_without_incident_code sm
+    inner join recent_open_incidents roi 
+    on sm.channel = roi.external_source_id 
+    and sm.reporter_id = roi.reportee_id 
+    and sm.category = roi.category
+)
+
+, tied_candidates as (
+    select 
+        *,
+        ai_filter(
+            prompt('The Slack message {0} describes the same issue as the incident whose latest comment is {1}', text, last_comment)
+        ) as is_llm_match
+    from incident_candidates
+    where candidate_count > 1
+)
+
+, matched_incidents as (
+    select slack_message_id, file_id, incident_number, created_at, true as is_llm_match
+    from incident_candidates
+    where candidate_count = 1
+
+    union all
+
+    -- With several candidates only those the LLM accepts count; if it rejects all of them
+    -- the message falls through to a new incident
+    select slack_message_id, file_id, incident_number, created_at, is_llm_match
+    from tied_candidates
+    where is_llm_match
+)
+
+, messages_with_matching_incidents as (
+    select 
+        sm.*,
+        mi.incident_number as existing_incident_number
+    from messages_without_incident_code sm
+    left join matched_incidents mi 
+    on sm.slack_message_id = mi.slack_message_id 
+    and equal_null(sm.file_id, mi.file_id)
+    -- Several accepted candidates resolve to the most recent one
+    qualify row_number() over (
+        partition by sm.slack_message_id, sm.file_id 
+        order by mi.created_at desc nulls last
+    ) = 1
+)
+
+-- Messages that already have incident codes keep them; the others use the matched
+-- incident if found, otherwise a newly generated number
+select 
+    slack_message_id,
+    file_id,
+    incident_number,
+    category,
+    'extracted' as assignment,
+    current_timestamp() as assigned_at
+from messages_with_incident_code
+
+union all
+
+select 
+    slack_message_id,
+    file_id,
+    coalesce(existing_incident_number, concat_ws('-', 'INC', '2025', randstr(3, random()))) as incident_number,
+    category,
+    iff(existing_incident_number is null, 'new', 'matched') as assignment,
+    current_timestamp() as assigned_at
+from messages_with_matching_incidents
@@ -4,17 +4,39 @@
         ,incremental_strategy='merge'
         ,unique_key='email'
         ,merge_exclude_columns=['created_at']
+        ,on_schema_change='append_new_columns'
+        ,post_hook=["
+            update {{ this }} set source_lastupdated = w.source_lastupdated
+            from (
+                select max(lastupdated) as source_lastupdated
+                from {{ source('bronze_zone', 'slack_members') }}
+                where lastupdated <= '{{ run_started_at }}'::timestamp_tz
+            ) w
+            where w.source_lastupdated > coalesce({{ this }}.source_lastupdated, '1970-01-01'::timestamp_tz)
+        "]
         ,description='Materialized users table with enriched data'
         ,tags=['daily']
     )
 }}
 
+-- Only channels updated since the last run are flattened, and only members whose row hash differs
+-- from the stored one reach the merge, so updated_at changes only when a member actually changed.
+-- The post hook advances source_lastupdated to the newest slack_members row read by this run, even when
+-- no member changed; a table created before the watermark columns existed is read in full once.
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['source_lastupdated', 'row_hash']) %}
+
 with _temp as (
  select 
  *, 
  arrays_zip(memberids, memberemails) as zip_data 
  from {{ source('bronze_zone', 'slack_members') }} sm
+ where sm.lastupdated <= '{{ run_started_at }}'::timestamp_tz
+ {% if has_watermark %}
+ and sm.lastupdated > (select coalesce(max(source_lastupdated), '1970-01-01'::timestamp_tz) from {{ this }})
+ {% endif %}
 )
+
+, members as (
 select 
    f.value:$1 as id,
    f.value:$2 as email,
@@ -24,7 +46,31 @@ select
     '' as department,
     '' as team,
     true as is_active,
-    current_timestamp() as created_at,
-    current_timestamp() as updated_at
+    _temp.lastupdated as source_lastupdated
 from _temp,
-lateral flatten(input => zip_data) f
\ No newline at end of file
+lateral flatten(input => zip_data) f
+-- A member of several channels appears once per channel
+qualify row_number() over (partition by email order by _temp.lastupdated desc) = 1
+)
+
+, hashed_members as (
+select
+    *,
+    sha2(concat_ws('|', id::string, email::string, first_name::string, last_name::string, role, department, team, is_active::string), 256) as row_hash
+from members
+)
+
+select 
+    m.* exclude (source_lastupdated, row_hash),
+    current_timestamp() as created_at,
+    current_timestamp() as updated_at,
+    m.source_lastupdated,
+    m.row_hash
+from hashed_members m
+{% if has_watermark %}
+where not exists (
+    select 1 from {{ this }} t
+    where t.email = m.email
+    and t.row_hash = m.row_hash
+)
+{% endif %}
@@ -8,11 +8,7 @@
 
 select
    *,
-    case 
-        when contains(relative_path, 'qa') then 'question'
-        when contains(relative_path, 'full') then 'full'
-        else 'slack'
-    end as doc_type,
+    {{ document_type('relative_path') }} as doc_type,
     split_part(relative_path, '.', 2) as extension
 from {{ source('bronze_zone', 'documents_stream') }}
 WHERE METADATA$ACTION != 'DELETE'
@@ -0,0 +1,15 @@
+{{
+    config(
+        materialized='view'
+        , description='Number of qualified Slack messages per incident code extraction tier'
+        , tags=['daily']
+    )
+}}
+
+-- Counts come from the candidates view, so no extraction work is triggered
+select 
+    extraction_tier,
+    hasfiles,
+    count(*) as message_count
+from {{ ref('v_slack_message_candidates') }}
+group by extraction_tier, hasfiles
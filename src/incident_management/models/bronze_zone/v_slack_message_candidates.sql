@@ -0,0 +1,86 @@
+{{
+    config(
+        materialized='view'
+        , description='Slack messages from known reporters that could be related to incidents, with the tier used to extract their incident number'
+        , tags=['daily']
+    )
+}}
+
+-- Only propagate messages from known reporters (users in channel)
+-- No LLM calls happen here; extraction results are memoized in slack_message_extractions
+-- Only messages inside the per channel window of the latest watermark run are considered
+with current_windows as (
+    select channel, low_ingestts, high_ingestts
+    from {{ ref('slack_channel_watermarks') }}
+    qualify run_at = max(run_at) over ()
+)
+
+, slack_messages_from_known_reporters as (
+    select 
+        sm.*, 
+        r.id as reporter_id,
+        {{ incident_code_from_text('sm.text') }} as regex_incident_code
+    from {{ source('bronze_zone', 'slack_messages') }} sm
+    inner join {{ source('bronze_zone', 'users') }} r on sm.username = split(r.email, '@')[0]
+    inner join current_windows w on sm.channel = w.channel
+    where sm.clientmsgid is not null
+    and sm.ingestts > w.low_ingestts
+    and sm.ingestts <= w.high_ingestts
+)
+
+-- Messages with attachments (with join to doc_metadata)
+select 
+    true as hasfiles,
+    sm.type,
+    sm.subtype,
+    sm.team,
+    sm.channel,
+    sm.user,
+    sm.username,
+    sm.reporter_id,
+    sm.text,
+    sm.ts,
+    sm.clientmsgid as slack_message_id,
+    
+    -- Attachment metadata from doc_metadata
+    dm.file_id,
+    dm.file_name, 
+    dm.file_mimetype, 
+    dm.file_size, 
+    dm.staged_file_path,
+    to_file('{{ var("docs_stage_path") }}', dm.staged_file_path) as attachment_file,
+    sm.regex_incident_code,
+    {{ incident_extraction_tier('hasfiles', 'attachment_file', 'sm.text', 'sm.regex_incident_code') }} as extraction_tier
+
+from slack_messages_from_known_reporters sm
+inner join {{source('bronze_zone', 'doc_metadata')}} dm 
+on (sm.hasfiles and (sm.channel = dm.channel_id) and (sm.ts = dm.event_ts))
+
+UNION ALL
+
+-- Messages without attachments (no join to doc_metadata)
+select 
+    false as hasfiles,
+    sm.type,
+    sm.subtype,
+    sm.team,
+    sm.channel,
+    sm.user,
+    sm.username,
+    sm.reporter_id,
+    sm.text,
+    sm.ts,
+    sm.clientmsgid as slack_message_id,
+    
+    -- No attachment metadata for messages without files
+    null as file_id,
+    null as file_name, 
+    null as file_mimetype, 
+    null as file_size, 
+    null as staged_file_path,
+    null as attachment_file,
+    sm.regex_incident_code,
+    {{ incident_extraction_tier('hasfiles', 'attachment_file', 'sm.text', 'sm.regex_incident_code') }} as extraction_tier
+
+from slack_messages_from_known_reporters sm
+where not sm.hasfiles or sm.hasfiles is null
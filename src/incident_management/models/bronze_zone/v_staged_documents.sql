@@ -0,0 +1,23 @@
+{{
+    config(
+        materialized='view'
+        , description='View of all supported documents currently on the documents stage'
+        , tags=['document_processing']
+    )
+}}
+
+-- Same qualification as v_qualify_new_documents, but over the stage directory instead of the stream,
+-- so models reading it can catch up on documents deferred by earlier runs
+select
+    relative_path,
+    size,
+    last_modified,
+    md5,
+    etag,
+    file_url,
+    {{ document_type('relative_path') }} as doc_type,
+    split_part(relative_path, '.', 2) as extension
+from directory({{ var("docs_stage_path") }})
+where relative_path is not null
+and array_contains(extension::VARIANT, {{ var("supported_doc_formats") }} )
+and size > 0
@@ -1,11 +1,25 @@
 {{
   config(
-    materialized='table'
+    materialized=var('gold_incidents_materialization')
+    , incremental_strategy='merge'
+    , unique_key='incident_number'
+    , on_schema_change='sync_all_columns'
+    , target_lag=var('gold_incidents_target_lag')
+    , snowflake_warehouse=var('gold_incidents_warehouse') or target.warehouse
+    , post_hook=("delete from {{ this }} where status != 'open'" if var('gold_incidents_materialization') == 'incremental' else [])
     , description='Active incidents requiring attention with SLA status and priority ordering'
     , tags=['daily']
   )
 }}
 
+-- age_hours is not stored: it changes every hour, so it is computed at read time (see the incm360 semantic view).
+-- Incremental runs only re-join the incidents (or their users) changed since the last run; incidents that are
+-- no longer open are merged and then removed by the post hook. The watermark is the latest change of the incident
+-- (see incident_changed_at: the dbt merge's processed_at, or updated_at/closed_at set by status writers) or of its users,
+-- so late-ingested messages with an older ts and incidents closed or reassigned outside dbt are both picked up.
+-- sync_all_columns drops columns removed from the model (age_hours); a table without the watermark is merged in full once.
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['source_changed_at']) %}
+
 SELECT 
     i.incident_number,
     i.title,
@@ -18,11 +32,16 @@ SELECT
     CONCAT(reportee.first_name, ' ', reportee.last_name) AS reportee_name,
     i.created_at,
     i.updated_at,
-    DATEDIFF('hour', i.created_at, CURRENT_TIMESTAMP()) AS age_hours,
     i.source_system,
     i.external_source_id,
-    i.has_attachments
+    i.has_attachments,
+    GREATEST_IGNORE_NULLS({{ incident_changed_at('i') }}, assignee.updated_at, reportee.updated_at) AS source_changed_at
 FROM {{ ref('incidents') }} i
 LEFT JOIN {{ ref('users') }} assignee ON i.assignee_id = assignee.id
 LEFT JOIN {{ ref('users') }} reportee ON i.reportee_id = reportee.id
+{% if has_watermark %}
+WHERE GREATEST_IGNORE_NULLS({{ incident_changed_at('i') }}, assignee.updated_at, reportee.updated_at)
+    > (select coalesce(max(source_changed_at), '1970-01-01'::timestamp_tz) from {{ this }})
+{% elif not is_incremental() %}
 WHERE i.status = 'open'
+{% endif %}
@@ -1,11 +1,22 @@
 {{
   config(
-    materialized='table'  
+    materialized=var('gold_incidents_materialization')
+    ,incremental_strategy='merge'
+    ,unique_key='incident_number'
+    ,on_schema_change='sync_all_columns'
+    ,target_lag=var('gold_incidents_target_lag')
+    ,snowflake_warehouse=var('gold_incidents_warehouse') or target.warehouse
+    ,post_hook=("delete from {{ this }} where not (lower(status) in ('closed', 'resolved') and closed_at is not null)" if var('gold_incidents_materialization') == 'incremental' else [])
     ,description='Closed incidents with resolution metrics, SLA compliance analysis, and performance insights'
     ,tags=['daily']
   )
 }}
 
+-- Incremental runs only merge incidents changed since the last run (see incident_changed_at), whether by the dbt
+-- incidents merge or by a status writer closing them; reopened incidents are removed by the post hook.
+-- sync_all_columns keeps the table in step with the model; a table without the watermark is merged in full once.
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['source_changed_at']) %}
+
 SELECT 
     i.incident_number,
     i.title,
@@ -24,6 +35,7 @@ SELECT
     i.source_system,
     i.external_source_id,
     i.has_attachments,
+    {{ incident_changed_at('i') }} AS source_changed_at,
     
     -- Resolution metrics (simplified)
     DATEDIFF('minute', i.created_at, i.closed_at) / 60.0 AS total_resolution_hours,
@@ -34,4 +46,8 @@ SELECT
     EXTRACT(quarter FROM i.closed_at) AS closed_quarter
 
 FROM {{ ref('incidents') }} i
+{% if has_watermark %}
+WHERE {{ incident_changed_at('i') }} > (select coalesce(max(source_changed_at), '1970-01-01'::timestamp_tz) from {{ this }})
+{% elif not is_incremental() %}
 WHERE LOWER(i.status) IN ('closed', 'resolved') AND i.closed_at IS NOT NULL
+{% endif %}
@@ -0,0 +1,30 @@
+{{
+  config(
+    materialized='incremental'
+    ,incremental_strategy='merge'
+    ,on_schema_change='sync_all_columns'
+    ,unique_key=['month', 'category']
+    ,description='Monthly incident counts per category, refreshed only for months with changed incidents'
+    ,tags=['daily', 'trends']
+    ,post_hook="
+        delete from {{ this }}
+        where month in (select month from {{ this }} where refreshed_at = (select max(refreshed_at) from {{ this }}))
+        and refreshed_at < (select max(refreshed_at) from {{ this }})
+    "
+  )
+}}
+
+-- The post hook drops categories that no longer occur in a recomputed month
+
+with {{ incident_trend_buckets('month') }}
+
+SELECT 
+    bucket AS month,
+    category,
+    COUNT(*) AS incident_count,
+
+    -- Watermark for the next incremental run
+    MAX(changed_at) AS source_changed_at,
+    CURRENT_TIMESTAMP() AS refreshed_at
+FROM bucket_incidents
+GROUP BY bucket, category
@@ -1,24 +1,37 @@
 {{
     config(
         materialized='incremental'
-        ,incremental_strategy='merge'
-        ,unique_key=['id']
-        ,merge_update_columns=['created_at', 'content', 'author_id', 'incident_number']
-        ,description='Simplified incident comment history for tracking communication'
+        ,incremental_strategy='append'
+        ,on_schema_change='append_new_columns'
+        ,description='Append-only log of every Slack message posted against an incident'
         ,tags=['daily']
     )
 }}
 
+-- depends_on: {{ ref('incidents') }}
+
+-- One row per qualified Slack message, appended once and never updated.
+-- v_qualify_slack_messages already limits each run to the per channel ingestts window, and the
+-- incident of every message comes from slack_message_incidents, so messages that land on the
+-- same incident in one batch are all logged. created_at is the Slack message timestamp; inserted_at is the
+-- time the row was appended, which downstream models use as their watermark.
 select 
-    slack_message_id as id,
-    i.incident_number,
-    i.reportee_id as author_id,
-    i.last_comment as content,
-    current_timestamp() as created_at
-from {{ref('incidents')}} i
+    qm.slack_message_id as id,
+    smi.incident_number,
+    qm.reporter_id as author_id,
+    qm.text as content,
+    qm.ts as created_at,
+    current_timestamp() as inserted_at
+from {{ ref('v_qualify_slack_messages') }} qm
+inner join {{ ref('slack_message_incidents') }} smi 
+on qm.slack_message_id = smi.slack_message_id 
+and equal_null(qm.file_id, smi.file_id)
+where qm.text is not null
 
 {% if is_incremental() %}
-where i.updated_at > (select coalesce(max(created_at), dateadd('day', -1, current_timestamp())) from {{this}})
-and i.updated_at >= dateadd('day', -1, current_timestamp())
-and i.status = 'open'
-{% endif %}
\ No newline at end of file
+-- Windows can overlap (retries, backfills), so only messages not already logged are appended
+and not exists (select 1 from {{ this }} ich where ich.id = qm.slack_message_id)
+{% endif %}
+
+-- Messages with several attachments arrive once per file
+qualify row_number() over (partition by qm.slack_message_id order by qm.file_id nulls first) = 1
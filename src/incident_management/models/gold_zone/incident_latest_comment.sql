@@ -0,0 +1,45 @@
+{{
+    config(
+        materialized='incremental'
+        ,incremental_strategy='merge'
+        ,unique_key='incident_number'
+        ,on_schema_change='append_new_columns'
+        ,description='Latest comment per incident, maintained incrementally from the comment history'
+        ,tags=['daily']
+    )
+}}
+
+-- One row per incident holding its most recent comment. Incremental runs only read comments appended to the
+-- history since the last run (inserted_at, a processing time), rank them and merge the winners by incident number.
+-- Comments carry their source timestamp, so the comparison is per incident: a channel that lags behind others
+-- still updates its incidents. A table without the watermark is compared against the whole history once.
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['source_inserted_at']) %}
+
+with
+
+new_comments as (
+    select 
+        *,
+        -- Taken over every new comment, so the watermark moves past comments that do not win below
+        max(inserted_at) over () as batch_inserted_at
+    from {{ ref('incident_comment_history') }}
+    {% if has_watermark %}
+    where inserted_at > (select coalesce(max(source_inserted_at), '1970-01-01'::timestamp_ltz) from {{ this }})
+    {% endif %}
+)
+
+select 
+    ich.incident_number,
+    ich.id as comment_id,
+    ich.author_id,
+    ich.content as latest_comment,
+    ich.created_at as latest_comment_at,
+    ich.batch_inserted_at as source_inserted_at
+from new_comments ich
+
+{% if is_incremental() %}
+left join {{ this }} ilc on ich.incident_number = ilc.incident_number
+where ich.created_at > coalesce(ilc.latest_comment_at, '1970-01-01'::timestamp_tz)
+{% endif %}
+
+qualify row_number() over (partition by ich.incident_number order by ich.created_at desc, ich.id desc) = 1
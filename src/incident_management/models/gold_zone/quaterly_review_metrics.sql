@@ -1,33 +1,77 @@
 {{
   config(
     materialized='incremental'
-    ,incremental_strategy='merge'
+    ,incremental_strategy='delete+insert'
     ,unique_key=['filename']
-    ,merge_exclude_columns=['created_at']
+    ,on_schema_change='append_new_columns'
     ,description='Flattened question extracts from documents with quarterly review metrics'
     ,tags=['document_processing']
+    ,pre_hook="
+      {% if is_incremental() and relation_has_columns(this, ['md5']) %}
+      delete from {{ this }} t
+      using (
+        select split(ts.relative_path, '/')[1]::string as filename, ts.md5
+        from {{ ref('document_tombstones') }} ts
+        where ts.recorded_at > (select coalesce(max(created_at), '1970-01-01'::timestamp_ltz) from {{ this }})
+        and not exists (
+          select 1 from {{ ref('v_staged_documents') }} sd
+          where sd.relative_path = ts.relative_path
+          and sd.md5 = ts.md5
+        )
+      ) ts
+      where t.filename = ts.filename
+      and t.md5 = ts.md5
+      {% endif %}
+    "
   )
 }}
 
+-- Each run takes the extracts written after the watermark, keeps the latest version per file and
+-- anti-joins on (filename, md5) so unchanged content is skipped. The watermark is the extraction time,
+-- so a deck extracted late by the retry queue is still picked up. A corrected deck has a new checksum,
+-- so its metrics replace the previous ones for the file (delete+insert on filename).
+-- The pre hook drops metrics of document versions tombstoned since the last insert (deleted, or replaced by
+-- different content), so only the new tombstones are read rather than the whole extracts table.
+-- A table created before the watermark columns existed is read in full once.
 
-with document_question_extracts as (
+-- depends_on: {{ ref('document_tombstones') }}
+-- depends_on: {{ ref('v_staged_documents') }}
+{% set has_watermark = is_incremental() and relation_has_columns(this, ['md5', 'source_extracted_at']) %}
+
+with latest_document_question_extracts as (
   select 
-  split(relative_path, '/')[1] as filename,
-  QUESTION_EXTRACTS_JSON:response as response
+    split(relative_path, '/')[1]::string as filename,
+    md5,
+    last_modified,
+    extracted_at,
+    QUESTION_EXTRACTS_JSON:response as response
   from {{ ref('document_question_extracts') }} 
-  where 
-  {% if is_incremental() %}
-    lower(trim(filename)) not in ( select distinct lower(trim(filename)) from {{ this }} )
-    and to_timestamp_ntz(last_modified) > ( select max(to_timestamp_ntz(created_at)) from {{ this }} )
-    and is_null_value(question_extracts_json:error)
+  where (is_null_value(question_extracts_json:error) or question_extracts_json:error is null)
+  {% if has_watermark %}
+    and extracted_at > ( select coalesce(max(source_extracted_at), '1970-01-01'::timestamp_tz) from {{ this }} )
   {% endif %}
-  
+  qualify row_number() over (partition by filename order by last_modified desc) = 1
 )
+
+, document_question_extracts as (
+  select dq.*
+  from latest_document_question_extracts dq
+  {% if has_watermark %}
+  where not exists (
+    select 1 from {{ this }} t
+    where t.filename = dq.filename
+    and t.md5 = dq.md5
+  )
+  {% endif %}
+)
+
 select
 dq.filename,
 lf.key as metric,
 lf.value::string as value,
+dq.md5,
+dq.last_modified as source_last_modified,
+dq.extracted_at as source_extracted_at,
 current_timestamp() as created_at,
 from document_question_extracts dq,
 lateral flatten(input => response) lf
-
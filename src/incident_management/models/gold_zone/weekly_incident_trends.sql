@@ -1,13 +1,18 @@
 {{
   config(
-    materialized='table'
-    ,description='Weekly incident trends for the last 12 weeks showing resolution patterns'
-    ,tags=['weekly']
+    materialized='incremental'
+    ,incremental_strategy='merge'
+    ,on_schema_change='sync_all_columns'
+    ,unique_key='week'
+    ,description='Weekly incident trends showing resolution patterns, refreshed only for weeks with changed incidents'
+    ,tags=['daily', 'weekly', 'trends']
   )
 }}
 
+with {{ incident_trend_buckets('week') }}
+
 SELECT 
-    DATE_TRUNC('week', created_at) AS week,
+    bucket AS week,
     COUNT(*) AS total_incidents,
     COUNT(CASE WHEN status = 'resolved' THEN 1 END) AS resolved_incidents,
     COUNT(CASE WHEN status = 'closed' THEN 1 END) AS closed_incidents,
@@ -41,8 +46,10 @@ SELECT
     -- Resolution rate percentage
     ROUND(
         (COUNT(CASE WHEN status IN ('resolved', 'closed') THEN 1 END)::DECIMAL / COUNT(*)) * 100, 2
-    ) AS resolution_rate_percentage
-FROM {{ ref('incidents') }}
-WHERE created_at >= DATEADD('year', -1, CURRENT_DATE())
-GROUP BY DATE_TRUNC('week', created_at)
-ORDER BY week DESC
+    ) AS resolution_rate_percentage,
+
+    -- Watermark for the next incremental run
+    MAX(changed_at) AS source_changed_at,
+    CURRENT_TIMESTAMP() AS refreshed_at
+FROM bucket_incidents
+GROUP BY bucket
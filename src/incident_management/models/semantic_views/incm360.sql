@@ -41,8 +41,8 @@ RELATIONSHIPS (
 
 
 FACTS (
-    active_incidents.age_hours AS age_hours
-      COMMENT = 'Age of incident in hours'
+    active_incidents.age_hours AS DATEDIFF('hour', active_incidents.created_at, CURRENT_TIMESTAMP())
+      COMMENT = 'Age of incident in hours, computed at query time'
     , closed_incidents.total_resolution_hours AS total_resolution_hours
       COMMENT = 'Total time from creation to closure in hours'
     , closed_incidents.closed_year AS closed_year
@@ -1,24 +1,57 @@
 {{
     config(
         materialized='incremental'
+        ,incremental_strategy='merge'
+        ,unique_key=['relative_path', 'page_num', 'chunk_index']
+        ,on_schema_change='append_new_columns'
         ,description='Table that contains the full extracts from the documents'
         ,tags=['document_processing']
+        ,post_hook=[
+            "delete from {{ this }} t
+            using (
+                select relative_path, parse_key
+                from {{ this }}
+                qualify row_number() over (partition by relative_path order by last_modified desc, parse_key nulls last) = 1
+            ) latest
+            where t.relative_path = latest.relative_path
+            and t.parse_key is distinct from latest.parse_key",
+            "{{ apply_document_tombstones(this) }}"
+        ]
     )
 }}
 
+-- depends_on: {{ ref('document_tombstones') }}
+
+-- Parsed pages come from document_parse_cache, so re-uploading identical content never re-parses it.
+-- Documents are read from the stage directory, so large documents deferred by the parse cache are chunked once parsed.
+-- Chunks are merged by (file, page, chunk index); the post hooks drop chunks left over from older content of a file
+-- and chunks of deleted or replaced versions, so the search service only indexes live content.
+-- A table created before parse_key existed is re-chunked in full once; its legacy chunks (null parse_key) are then dropped.
+{% set has_parse_key = is_incremental() and relation_has_columns(this, ['parse_key']) %}
+
 with 
-documents_raw_extracts as(
+latest_document_parses as(
     select
-        * exclude (METADATA$ACTION, METADATA$ISUPDATE, METADATA$ROW_ID) ,
-        AI_PARSE_DOCUMENT (
-            TO_FILE('{{ var("docs_stage_path") }}',relative_path),
-             {
-                'mode': '{{var("parse_mode")}}'
-                ,'page_split': {{var("page_split")}}
-             }
-        ) as raw_extracts
-        FROM {{ ref('v_qualify_new_documents') }}
-        WHERE lower(doc_type) = 'full'
+        d.*,
+        pc.parse_key,
+        pc.raw_extracts
+        FROM {{ ref('v_staged_documents') }} d
+        INNER JOIN {{ ref('document_parse_cache') }} pc
+        ON d.md5 = pc.md5
+        AND pc.page_split = {{ var("page_split") }}
+        WHERE lower(d.doc_type) = 'full'
+        QUALIFY row_number() over (partition by d.relative_path order by d.last_modified desc, pc.parsed_at desc) = 1
+),
+documents_raw_extracts as(
+    select lp.*
+    from latest_document_parses lp
+    {% if has_parse_key %}
+    where not exists (
+        select 1 from {{ this }} t 
+        where t.relative_path = lp.relative_path 
+        and t.parse_key = lp.parse_key
+    )
+    {% endif %}
 ),
 documents_chunked_extracts as
 (
@@ -37,6 +70,7 @@ documents_chunked_extracts as
 
 select 
     og2.* exclude (page_chunks), 
+    lf2.index::int as chunk_index,
     lf2.value['chunk']::varchar as chunk,
     lf2.value['headers']::object as headers
 from documents_chunked_extracts og2,
@@ -0,0 +1,156 @@
+import uuid
+
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import Session, Window
+from snowflake.snowpark.types import DoubleType, StringType, StructField, StructType
+
+
+def parse_documents(documents, docs_stage, parse_mode, page_split):
+    return documents.with_column(
+        'raw_extracts',
+        F.call_builtin(
+            'AI_PARSE_DOCUMENT',
+            F.call_builtin('TO_FILE', F.lit(f'{docs_stage}'), F.col('relative_path')),
+            {'mode': parse_mode, 'page_split': page_split}
+        )
+    )
+
+
+def parse_into(session: Session, documents, parsed_table, docs_stage, parse_mode, page_split):
+    # Blocking append of one parse statement to parsed_table; returns the statement's query id
+    parse_documents(documents, docs_stage, parse_mode, page_split).write.save_as_table(
+        parsed_table, mode='append', column_order='name'
+    )
+    return session.sql('select last_query_id()').collect()[0][0]
+
+
+def statement_seconds(session: Session, query_ids):
+    # Execution time of the statement that parsed each document, excluding time spent queued on the warehouse
+    if not query_ids:
+        return session.create_dataframe([], schema=StructType([
+            StructField('relative_path', StringType()), StructField('parse_seconds', DoubleType())
+        ]))
+    # Fast lane documents share one statement
+    ids = ', '.join(f"'{query_id}'" for query_id in sorted(set(query_ids.values())))
+    history = session.sql(f"""
+        select query_id, (execution_time / 1000)::float as parse_seconds
+        from table(information_schema.query_history_by_session(result_limit => 10000))
+        where query_id in ({ids})
+    """)
+    paths = session.create_dataframe(
+        [[query_id, relative_path] for relative_path, query_id in query_ids.items()],
+        schema=['query_id', 'relative_path']
+    )
+    return paths.join(history, 'query_id').select('relative_path', 'parse_seconds')
+
+
+def model(dbt, session: Session):
+
+    dbt.config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='parse_key',
+        description='Content-addressed cache of AI_PARSE_DOCUMENT output keyed on file md5, parse mode and page split',
+        tags=['document_processing']
+    )
+
+    docs_stage = dbt.config.get("docs_stage_path")
+    parse_mode = dbt.config.get("parse_mode")
+    page_split = str(dbt.config.get("page_split")).lower() == 'true'
+    large_parse_mode = dbt.config.get("large_document_parse_mode") or parse_mode
+    large_size_bytes = int(dbt.config.get("large_document_size_bytes"))
+    large_page_count = int(dbt.config.get("large_document_page_count"))
+    large_batch_size = int(dbt.config.get("large_document_batch_size"))
+
+    # Reads the stage directory rather than documents_stream so deferred documents are picked up later
+    documents = dbt.ref('v_staged_documents').filter(
+        F.col('doc_type') == 'full'
+    ).select('relative_path', 'size', 'last_modified', 'md5')
+
+    if dbt.is_incremental:
+        cache = session.table(str(dbt.this))
+
+        # Content already parsed in either lane's mode is never parsed again, whichever lane it
+        # would be routed to now (document_full_extracts uses the latest parse of the content)
+        cached = cache.filter(
+            (F.col('page_split') == F.lit(page_split))
+            & F.col('parse_mode').isin(parse_mode, large_parse_mode)
+        ).select(F.col('md5').alias('cached_md5')).distinct()
+        documents = documents.join(
+            cached, documents['MD5'] == cached['CACHED_MD5'], how='leftanti'
+        )
+
+        # Page counts from earlier parses of the same path route new content of known long documents to the large lane
+        known_pages = cache.group_by('parsed_from_path').agg(
+            F.max('page_count').alias('known_page_count')
+        )
+        documents = documents.join(
+            known_pages, documents['RELATIVE_PATH'] == known_pages['PARSED_FROM_PATH'], how='left'
+        ).drop('parsed_from_path')
+    else:
+        documents = documents.with_column('known_page_count', F.lit(None).cast('number'))
+
+    is_large = (F.col('size') > large_size_bytes) | (F.coalesce(F.col('known_page_count'), F.lit(0)) > large_page_count)
+    documents = documents.with_column(
+        'parse_lane', F.iff(is_large, F.lit('large'), F.lit('fast'))
+    ).with_column(
+        'parse_mode', F.iff(is_large, F.lit(large_parse_mode), F.lit(parse_mode))
+    ).with_column(
+        'parse_key',
+        F.sha2(F.concat_ws(F.lit('|'), F.col('md5'), F.col('parse_mode'), F.lit(str(page_split))), 256)
+    )
+
+    pending = documents.with_column(
+        'content_rank', F.row_number().over(Window.partition_by('md5').order_by(F.col('last_modified').desc()))
+    ).filter(F.col('content_rank') == 1).with_column(
+        'lane_rank', F.row_number().over(Window.partition_by('parse_lane').order_by(F.col('last_modified').asc()))
+    ).select(
+        'parse_key', 'md5', 'parse_mode', 'parse_lane', 'size', 'lane_rank',
+        F.col('relative_path').alias('parsed_from_path'),
+        F.col('relative_path')
+    ).cache_result()
+
+    # Parse statements append to a temporary table so each lane's statement can be timed
+    parsed_table = f"document_parse_cache_batch_{uuid.uuid4().hex}"
+    parse_documents(pending.limit(0), docs_stage, parse_mode, page_split).write.save_as_table(
+        parsed_table, table_type='temporary'
+    )
+
+    # Fast lane: all small documents in a single set-based statement
+    fast_lane = pending.filter(F.col('parse_lane') == 'fast')
+    fast_paths = [row['RELATIVE_PATH'] for row in fast_lane.select('relative_path').collect()]
+    fast_query_ids = {}
+    if fast_paths:
+        fast_query_id = parse_into(session, fast_lane, parsed_table, docs_stage, parse_mode, page_split)
+        fast_query_ids = {path: fast_query_id for path in fast_paths}
+
+    # Large lane: one statement per document, run one after the other, at most large_document_batch_size
+    # per run; the remaining large documents are parsed by the next runs (see incm_scheduled_docs_catchup)
+    large_lane = pending.filter(
+        (F.col('parse_lane') == 'large') & (F.col('lane_rank') <= large_batch_size)
+    )
+    large_query_ids = {}
+    for document in large_lane.select('relative_path').collect():
+        single = large_lane.filter(F.col('relative_path') == document['RELATIVE_PATH'])
+        large_query_ids[document['RELATIVE_PATH']] = parse_into(
+            session, single, parsed_table, docs_stage, large_parse_mode, page_split
+        )
+
+    durations = statement_seconds(session, {**fast_query_ids, **large_query_ids})
+    parsed = session.table(parsed_table).join(durations, 'relative_path', how='left').with_column(
+        'parse_batch_size',
+        F.iff(F.col('parse_lane') == 'fast', F.lit(len(fast_paths)), F.lit(1))
+    )
+
+    raw_extracts = F.col('raw_extracts')
+    return parsed.with_column(
+        'page_count',
+        F.coalesce(raw_extracts['metadata']['pageCount'], F.call_builtin('ARRAY_SIZE', raw_extracts['pages'])).cast('number')
+    ).with_column(
+        'page_split', F.lit(page_split)
+    ).with_column(
+        'parsed_at', F.current_timestamp()
+    ).select(
+        'parse_key', 'md5', 'parse_mode', 'page_split', 'parse_lane', 'parsed_from_path',
+        'size', 'page_count', 'parse_seconds', 'parse_batch_size', 'raw_extracts', 'parsed_at'
+    )
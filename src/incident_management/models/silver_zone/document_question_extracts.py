@@ -1,52 +1,192 @@
+import hashlib
+import json
+
 import snowflake.snowpark.functions as F
-from snowflake.snowpark import Session
+from snowflake.snowpark import Session, Window
+
+DOCUMENT_COLUMNS = [
+    'relative_path', 'size', 'last_modified', 'md5', 'etag', 'file_url', 'doc_type', 'extension'
+]
+
+
+def build_response_schema(all_meta, schema_version):
+    # Merge the properties of every enabled meta schema into a single AI_EXTRACT response schema
+    # and hash it, so documents are only re-extracted when the schema actually changes
+    reponse_schema = {
+        'schema': {
+            'type': 'object',
+            'properties': {}
+        }
+    }
+
+    enabled_groups = sorted(key for key in all_meta.keys() if all_meta[key]['enabled'])
+    for key in enabled_groups:
+        for prop in all_meta[key]['schema']['properties']:
+            reponse_schema['schema']['properties'][prop] = all_meta[key]['schema']['properties'][prop]
+
+    canonical = json.dumps(
+        {'version': schema_version, 'schema': reponse_schema}, sort_keys=True, separators=(',', ':')
+    )
+    schema_hash = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return reponse_schema, schema_hash, enabled_groups
+
+
+def ensure_retry_table(session: Session, retry_table):
+    session.sql(f"""
+        create table if not exists {retry_table} (
+            relative_path string,
+            size number,
+            last_modified timestamp_tz,
+            md5 string,
+            etag string,
+            file_url string,
+            doc_type string,
+            extension string,
+            schema_hash string,
+            attempts number,
+            status string,
+            last_error variant,
+            updated_at timestamp_ltz
+        )
+    """).collect()
+
+
+def update_retry_table(session: Session, retry_table, succeeded, failed, deferred, schema_hash, max_retries):
+    retries = session.table(retry_table)
+
+    # Extracted documents leave the queue
+    retries.delete(retries['RELATIVE_PATH'] == succeeded['RELATIVE_PATH'], succeeded)
+
+    # Failures count towards the retry budget; deferred documents keep their attempts
+    pending = failed.select(
+        *DOCUMENT_COLUMNS,
+        F.lit(1).alias('attempt_increment'),
+        F.col('question_extracts_json')['error'].alias('last_error')
+    ).union_all(
+        deferred.select(
+            *DOCUMENT_COLUMNS,
+            F.lit(0).alias('attempt_increment'),
+            F.lit(None).cast('variant').alias('last_error')
+        )
+    )
+
+    attempts = F.coalesce(retries['ATTEMPTS'], F.lit(0)) + pending['ATTEMPT_INCREMENT']
+    retries.merge(
+        pending,
+        retries['RELATIVE_PATH'] == pending['RELATIVE_PATH'],
+        [
+            F.when_matched().update({
+                **{column: pending[column] for column in DOCUMENT_COLUMNS},
+                'schema_hash': F.lit(schema_hash),
+                'attempts': attempts,
+                'status': F.iff(attempts >= max_retries, F.lit('exhausted'), F.lit('pending')),
+                'last_error': F.coalesce(pending['LAST_ERROR'], retries['LAST_ERROR']),
+                'updated_at': F.current_timestamp(),
+            }),
+            F.when_not_matched().insert({
+                **{column: pending[column] for column in DOCUMENT_COLUMNS},
+                'schema_hash': F.lit(schema_hash),
+                'attempts': pending['ATTEMPT_INCREMENT'],
+                'status': F.iff(pending['ATTEMPT_INCREMENT'] >= max_retries, F.lit('exhausted'), F.lit('pending')),
+                'last_error': pending['LAST_ERROR'],
+                'updated_at': F.current_timestamp(),
+            }),
+        ]
+    )
+
 
-    
 def model(dbt, session: Session):
 
     dbt.config(
         materialized='incremental',
         incremental_strategy='append',
+        on_schema_change='append_new_columns',
         description='Table to store question extracts from documents',
         tags=['document_processing']
     )
-    
+
     docs_stage = dbt.config.get("docs_stage_path")
+    batch_size = int(dbt.config.get("extraction_batch_size"))
+    max_retries = int(dbt.config.get("max_extraction_retries"))
 
-    all_meta = dbt.config.get("meta")
-    
-    reponse_schema = {
-        'schema': {
-            'type': 'object',
-            'properties': {}
-        }
-    }
-    
-    for key in all_meta.keys():
-        if all_meta[key]['enabled']:
-            for prop in all_meta[key]['schema']['properties']:
-                reponse_schema['schema']['properties'][prop] = all_meta[key]['schema']['properties'][prop]
+    reponse_schema, schema_hash, schema_groups = build_response_schema(
+        dbt.config.get("meta"), dbt.config.get("schema_version")
+    )
 
+    retry_table = f"{dbt.this.database}.{dbt.this.schema}.document_question_extract_retries"
+    ensure_retry_table(session, retry_table)
+
+    # Tombstones are applied to this table and the retry queue by the apply_document_tombstones pre hooks
+    # (see the model yml); the refs declare the hooks' dependencies
+    dbt.ref('document_tombstones')
+    dbt.ref('v_staged_documents')
 
     # Get the upstream model
     v_qualify_new_documents = dbt.ref('v_qualify_new_documents')
-    
+
     # Filter for question analysis type
-    document_all_pages = v_qualify_new_documents.filter(
+    new_documents = v_qualify_new_documents.filter(
         F.lower(F.col('doc_type')) == 'question'
-    ).drop(
-        "METADATA$ACTION",
-        "METADATA$ISUPDATE",
-        "METADATA$ROW_ID"
-    )
-    
-    document_all_pages = document_all_pages.with_column(
+    ).select(*DOCUMENT_COLUMNS)
+
+    # Documents that failed or were deferred by earlier runs and still have retries left
+    queued_documents = session.table(retry_table).filter(
+        F.col('status') == 'pending'
+    ).select(*DOCUMENT_COLUMNS)
+
+    candidates = new_documents.union_all(queued_documents)
+
+    # Skip documents already extracted with the same schema hash and content checksum
+    if dbt.is_incremental:
+        extracted = session.table(str(dbt.this)).filter(
+            F.col('schema_hash') == schema_hash
+        ).select(
+            F.col('relative_path').alias('extracted_path'),
+            F.col('md5').alias('extracted_md5')
+        ).distinct()
+        candidates = candidates.join(
+            extracted,
+            (candidates['RELATIVE_PATH'] == extracted['EXTRACTED_PATH'])
+            & (candidates['MD5'] == extracted['EXTRACTED_MD5']),
+            how='leftanti'
+        )
+
+    # Keep the newest version of each path, oldest documents first, limited to one batch per run
+    candidates = candidates.with_column(
+        'version_rank',
+        F.row_number().over(Window.partition_by('relative_path').order_by(F.col('last_modified').desc()))
+    ).filter(
+        F.col('version_rank') == 1
+    ).with_column(
+        'batch_rank',
+        F.row_number().over(Window.order_by(F.col('last_modified').asc(), F.col('relative_path')))
+    ).cache_result()
+
+    batch = candidates.filter(F.col('batch_rank') <= batch_size).select(*DOCUMENT_COLUMNS)
+    deferred = candidates.filter(F.col('batch_rank') > batch_size).select(*DOCUMENT_COLUMNS)
+
+    document_all_pages = batch.with_column(
         'question_extracts_json',
         F.call_builtin(
             'AI_EXTRACT',
             F.call_builtin('TO_FILE', F.lit(f'{docs_stage}'), F.col('relative_path')),
             reponse_schema
         )
-    ) 
-    
-    return document_all_pages
+    ).with_column(
+        'schema_hash', F.lit(schema_hash)
+    ).with_column(
+        'schema_groups', F.lit(','.join(schema_groups))
+    ).with_column(
+        'extracted_at', F.current_timestamp()
+    ).cache_result()
+
+    extract_error = F.col('question_extracts_json')['error']
+    has_error = F.col('question_extracts_json').is_null() | (
+        extract_error.is_not_null() & ~F.call_builtin('IS_NULL_VALUE', extract_error)
+    )
+    failed = document_all_pages.filter(has_error)
+    succeeded = document_all_pages.filter(~has_error)
+
+    update_retry_table(session, retry_table, succeeded, failed, deferred, schema_hash, max_retries)
+
+    return succeeded
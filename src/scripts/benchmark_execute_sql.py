@@ -0,0 +1,96 @@
+"""
+Benchmark the row-by-row and columnar (Arrow) result paths of execute_sql.
+
+Uses a stub Snowpark session that serves synthetic result sets shaped like the
+incident comment history, so no Snowflake connection is required.
+
+Usage:
+    python src/scripts/benchmark_execute_sql.py
+    python src/scripts/benchmark_execute_sql.py --sizes 10000 100000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+from snowflake.snowpark import Row
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit"))
+from main import execute_sql, execute_sql_batches  # noqa: E402
+
+
+class StubDataFrame:
+    """Minimal stand-in for a Snowpark DataFrame backed by an in-memory Arrow table."""
+
+    def __init__(self, table: pa.Table):
+        self._table = table
+
+    def limit(self, n: int) -> "StubDataFrame":
+        return StubDataFrame(self._table.slice(0, n))
+
+    def collect(self):
+        names = self._table.column_names
+        return [Row(**dict(zip(names, values))) for values in zip(*self._table.to_pydict().values())]
+
+    def to_pandas(self):
+        return self._table.to_pandas()
+
+    def to_pandas_batches(self):
+        for batch in self._table.to_batches(max_chunksize=65536):
+            yield batch.to_pandas()
+
+    def to_arrow_batches(self):
+        yield from self._table.to_batches(max_chunksize=65536)
+
+
+class StubSession:
+    """Returns the same synthetic result set for every query."""
+
+    def __init__(self, table: pa.Table):
+        self._table = table
+
+    def sql(self, sql: str) -> StubDataFrame:
+        return StubDataFrame(self._table)
+
+
+def synthetic_result(num_rows: int) -> pa.Table:
+    start = datetime(2025, 1, 1)
+    return pa.table({
+        "ID": [f"msg-{i:08d}" for i in range(num_rows)],
+        "INCIDENT_NUMBER": [f"INC-2025-{i % 5000:04d}" for i in range(num_rows)],
+        "AUTHOR_ID": [f"U{i % 300:05d}" for i in range(num_rows)],
+        "CONTENT": [f"Payment gateway returned 502 for checkout request {i}" for i in range(num_rows)],
+        "CREATED_AT": [start + timedelta(seconds=i) for i in range(num_rows)],
+        "TOTAL_RESOLUTION_HOURS": [float(i % 97) / 3.0 for i in range(num_rows)],
+    })
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'row-by-row (s)':>16} {'columnar (s)':>14} {'batches (s)':>13} {'speedup':>9}")
+    for size in args.sizes:
+        session = StubSession(synthetic_result(size))
+        row_path = time_call(lambda: execute_sql("select 1", session, columnar=False), args.repeat)
+        columnar_path = time_call(lambda: execute_sql("select 1", session), args.repeat)
+        batch_path = time_call(lambda: sum(len(b) for b in execute_sql_batches("select 1", session)), args.repeat)
+        print(f"{size:>10} {row_path:>16.3f} {columnar_path:>14.3f} {batch_path:>13.3f} {row_path / columnar_path:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
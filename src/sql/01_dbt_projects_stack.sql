@@ -65,6 +65,10 @@ ENCRYPTION = (TYPE = 'SNOWFLAKE_SSE');
 create or replace stream <% ctx.env.dbt_project_database %>.bronze_zone.documents_stream
 on stage <% ctx.env.dbt_project_database %>.bronze_zone.documents;
 
+-- Separate stream for deletes and replacements so document_tombstones does not consume documents_stream
+create or replace stream <% ctx.env.dbt_project_database %>.bronze_zone.documents_tombstone_stream
+on stage <% ctx.env.dbt_project_database %>.bronze_zone.documents;
+
 create or replace schema <% ctx.env.dbt_project_database %>.gold_zone;
 
 -- Users table (employees, customers, system users)
@@ -78,7 +82,9 @@ CREATE OR REPLACE TABLE <% ctx.env.dbt_project_database %>.bronze_zone.users (
     team VARCHAR(100),
     is_active BOOLEAN DEFAULT true,
     created_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
-    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP()
+    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
+    source_lastupdated TIMESTAMP_TZ, -- slack_members watermark maintained by the users model
+    row_hash STRING -- Hash of the member attributes, used to skip unchanged members
 );
 
 -- Main incidents table
@@ -108,6 +114,7 @@ CREATE OR REPLACE TABLE <% ctx.env.dbt_project_database %>.gold_zone.incidents (
     has_attachments BOOLEAN DEFAULT false, -- Indicates if incident has any attachments
     slack_message_id VARCHAR(100), -- Reference to the original Slack message that created this incident
     last_comment STRING, -- Most recent comment content for this incident
+    processed_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(), -- Time the pipeline last created or updated this incident
     CONSTRAINT fk_incidents_assignee FOREIGN KEY (assignee_id) REFERENCES <% ctx.env.dbt_project_database %>.bronze_zone.users(id),
     CONSTRAINT fk_incidents_reportee FOREIGN KEY (reportee_id) REFERENCES <% ctx.env.dbt_project_database %>.bronze_zone.users(id)
 );
@@ -119,6 +126,7 @@ CREATE OR REPLACE TABLE <% ctx.env.dbt_project_database %>.gold_zone.incident_co
     author_id STRING NOT NULL,
     content STRING NOT NULL,
     created_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
+    inserted_at TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP(), -- time the row was appended
     
     CONSTRAINT fk_comment_history_incident FOREIGN KEY (incident_number) REFERENCES <% ctx.env.dbt_project_database %>.gold_zone.incidents(incident_number),
     CONSTRAINT fk_comment_history_author FOREIGN KEY (author_id) REFERENCES <% ctx.env.dbt_project_database %>.bronze_zone.users(id)
@@ -137,13 +145,13 @@ put file://../../data/csv/users.csv  @<% ctx.env.dbt_project_database %>.bronze_
 put file://../../data/csv/incidents.csv @<% ctx.env.dbt_project_database %>.bronze_zone.csv_stage overwrite=true;
 put file://../../data/csv/incident_comment_history.csv @<% ctx.env.dbt_project_database %>.bronze_zone.csv_stage overwrite=true;
 
-copy into <% ctx.env.dbt_project_database %>.bronze_zone.users from 
+copy into <% ctx.env.dbt_project_database %>.bronze_zone.users (id, email, first_name, last_name, role, department, team, is_active, created_at, updated_at) from 
     @<% ctx.env.dbt_project_database %>.bronze_zone.csv_stage/users.csv 
     file_format = (type = csv field_delimiter = ',' skip_header = 1);
-copy into <% ctx.env.dbt_project_database %>.gold_zone.incidents from 
+copy into <% ctx.env.dbt_project_database %>.gold_zone.incidents (incident_number, title, category, priority, status, assignee_id, reportee_id, created_at, closed_at, updated_at, source_system, external_source_id, has_attachments, slack_message_id, last_comment) from 
     @<% ctx.env.dbt_project_database %>.bronze_zone.csv_stage/incidents.csv 
     file_format = (type = csv field_delimiter = ',' skip_header = 1);
-copy into <% ctx.env.dbt_project_database %>.gold_zone.incident_comment_history from 
+copy into <% ctx.env.dbt_project_database %>.gold_zone.incident_comment_history (id, incident_number, author_id, content, created_at) from 
     @<% ctx.env.dbt_project_database %>.bronze_zone.csv_stage/incident_comment_history.csv 
     file_format = (type = csv field_delimiter = ',' skip_header = 1);
 
@@ -2,6 +2,48 @@ use role <% ctx.env.dbt_project_admin_role %>;
 use database <% ctx.env.dbt_project_database %>;
 use schema <% ctx.env.dbt_project_database %>.dbt_project_deployments;
 
+-- The daily graph and the Slack micro-batch graph both run the incremental incident models, and the
+-- triggered and scheduled document graphs both run the document models; each takes its lock around its
+-- dbt run so two graphs never refresh the same models and watermarks at once
+create table if not exists incm_dbt_run_lock (
+    lock_name STRING,
+    holder STRING, -- task graph run group holding the lock
+    acquired_at TIMESTAMP_LTZ
+);
+
+insert into incm_dbt_run_lock (lock_name)
+select l.lock_name
+from (select column1 as lock_name from values ('incident_models'), ('document_models')) l
+where not exists (select 1 from incm_dbt_run_lock r where r.lock_name = l.lock_name);
+
+-- Takes lock_name for lock_holder, waiting up to max_wait_seconds; a lock held for more than
+-- two hours is considered abandoned (e.g. a cancelled run) and taken over
+create or replace procedure incm_acquire_dbt_run_lock(lock_name STRING, lock_holder STRING, max_wait_seconds NUMBER)
+returns boolean
+language sql
+as
+$$
+  DECLARE
+    _waited NUMBER DEFAULT 0;
+  BEGIN
+    LOOP
+      UPDATE incm_dbt_run_lock 
+      SET holder = :lock_holder, acquired_at = current_timestamp()
+      WHERE incm_dbt_run_lock.lock_name = :lock_name
+      AND (holder IS NULL OR holder = :lock_holder OR acquired_at < dateadd('hour', -2, current_timestamp()));
+      IF (SQLROWCOUNT > 0) THEN
+        RETURN TRUE;
+      END IF;
+      IF (_waited >= max_wait_seconds) THEN
+        RETURN FALSE;
+      END IF;
+      CALL SYSTEM$WAIT(30);
+      _waited := _waited + 30;
+    END LOOP;
+  END;
+$$
+;
+
 -- Core model refresh tasks
 -- Task to run project dependencies and compile all models, macros, and tests
 -- Does not need to be scheduled
@@ -35,10 +77,28 @@ create or replace task incm_daily_models_refresh
 	as 
   EXECUTE IMMEDIATE
   $$
+    DECLARE
+      _run_group_id STRING;
+      _acquired BOOLEAN;
+      _lock_timeout EXCEPTION (-20001, 'Timed out waiting for the Slack micro-batch run to release incm_dbt_run_lock');
     BEGIN
       LET _target := (SELECT SYSTEM$GET_TASK_GRAPH_CONFIG('target'));
+      _run_group_id := (SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'));
+
+      -- Waits for a running micro-batch to finish
+      CALL incm_acquire_dbt_run_lock('incident_models', :_run_group_id, 1800) INTO :_acquired;
+      IF (NOT _acquired) THEN
+        RAISE _lock_timeout;
+      END IF;
+
       LET command := 'run --select tag:daily --target '|| _target;
       EXECUTE DBT PROJECT <% ctx.env.dbt_project_name %> args=:command;
+
+      UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'incident_models' AND holder = :_run_group_id;
+    EXCEPTION
+      WHEN OTHER THEN
+        UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'incident_models' AND holder = :_run_group_id;
+        RAISE;
     END;
   $$
   ;
@@ -56,14 +116,284 @@ CREATE OR REPLACE TASK incm_triggered_docs_processing
   AS
   EXECUTE IMMEDIATE
   $$
+    DECLARE
+      _run_group_id STRING;
+      _acquired BOOLEAN;
+      _lock_timeout EXCEPTION (-20002, 'Timed out waiting for the scheduled documents catch-up to release incm_dbt_run_lock');
+    BEGIN
+      LET _target := (SELECT SYSTEM$GET_TASK_GRAPH_CONFIG('target'));
+      _run_group_id := (SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'));
+
+      CALL incm_acquire_dbt_run_lock('document_models', :_run_group_id, 1800) INTO :_acquired;
+      IF (NOT _acquired) THEN
+        RAISE _lock_timeout;
+      END IF;
+
+      LET command := 'run --select tag:document_processing --target '|| _target;
+      EXECUTE DBT PROJECT <% ctx.env.dbt_project_name %> args=:command;
+
+      UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'document_models' AND holder = :_run_group_id;
+    EXCEPTION
+      WHEN OTHER THEN
+        UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'document_models' AND holder = :_run_group_id;
+        RAISE;
+    END;
+  $$
+  ;
+
+
+-- Scheduled catch-up for the document models
+-- The triggered graph only runs while documents_stream has data, so work deferred by earlier runs
+-- (large documents beyond large_document_batch_size, question documents beyond extraction_batch_size
+-- and failed extractions with retries left) would wait for the next upload; this graph drains it on a
+-- schedule and does nothing when nothing is pending
+create or replace task incm_root_scheduled_docs_catchup
+	warehouse=<% ctx.env.dbt_pipeline_wh %>
+	schedule='<% ctx.env.docs_catchup_schedule %>'
+	config='{"target": "<% ctx.env.dbt_target %>"}'
+	as SELECT 1;
+
+create or replace task incm_scheduled_docs_catchup
+  warehouse=<% ctx.env.dbt_pipeline_wh %>
+  after incm_root_scheduled_docs_catchup
+  AS
+  EXECUTE IMMEDIATE
+  $$
+    DECLARE
+      _run_group_id STRING;
+      _acquired BOOLEAN;
+      _pending NUMBER DEFAULT 0;
     BEGIN
       LET _target := (SELECT SYSTEM$GET_TASK_GRAPH_CONFIG('target'));
+      _run_group_id := (SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'));
+
+      -- Staged content with no parse in document_parse_cache, and queued or deferred question extractions
+      SELECT
+        (SELECT count(*)
+         FROM <% ctx.env.dbt_project_database %>.bronze_zone.v_staged_documents d
+         WHERE d.doc_type = 'full'
+         AND NOT EXISTS (
+           SELECT 1 FROM <% ctx.env.dbt_project_database %>.silver_zone.document_parse_cache c WHERE c.md5 = d.md5
+         ))
+        + (SELECT count(*)
+           FROM <% ctx.env.dbt_project_database %>.silver_zone.document_question_extract_retries
+           WHERE status = 'pending')
+      INTO :_pending;
+
+      IF (_pending = 0) THEN
+        RETURN 'skipped: no pending documents';
+      END IF;
+
+      -- A running triggered graph picks up the same backlog
+      CALL incm_acquire_dbt_run_lock('document_models', :_run_group_id, 0) INTO :_acquired;
+      IF (NOT _acquired) THEN
+        RETURN 'skipped: incm_dbt_run_lock held by another run';
+      END IF;
+
       LET command := 'run --select tag:document_processing --target '|| _target;
       EXECUTE DBT PROJECT <% ctx.env.dbt_project_name %> args=:command;
+
+      UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'document_models' AND holder = :_run_group_id;
+    EXCEPTION
+      WHEN OTHER THEN
+        UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'document_models' AND holder = :_run_group_id;
+        RAISE;
+    END;
+  $$
+  ;
+
+
+-- Triggered micro-batch graph for near-real-time incident ingestion
+-- Runs the tag:daily lineage of the Slack messages source whenever new messages land on
+-- slack_messages_stream, recompiling the project only when a new project version has been deployed
+
+-- The Slack connector creates bronze_zone.slack_messages on its first sync, with its own column types,
+-- so the stream is only created once that table exists: here when the connector already runs, otherwise
+-- by incm_incident_ingestion_fallback below
+create or replace procedure incm_ensure_slack_messages_stream()
+returns boolean
+language sql
+as
+$$
+  DECLARE
+    _tables NUMBER DEFAULT 0;
+  BEGIN
+    SELECT count(*) INTO :_tables
+    FROM <% ctx.env.dbt_project_database %>.information_schema.tables
+    WHERE table_schema = 'BRONZE_ZONE' AND table_name = 'SLACK_MESSAGES';
+    IF (_tables = 0) THEN
+      RETURN FALSE;
+    END IF;
+
+    CREATE STREAM IF NOT EXISTS <% ctx.env.dbt_project_database %>.bronze_zone.slack_messages_stream
+    ON TABLE <% ctx.env.dbt_project_database %>.bronze_zone.slack_messages
+    APPEND_ONLY = TRUE;
+    RETURN TRUE;
+  END;
+$$
+;
+
+call incm_ensure_slack_messages_stream();
+
+-- One row per micro-batch with its size, runtime and end-to-end latency
+create table if not exists incm_incident_ingestion_runs (
+    run_group_id STRING,
+    batch_rows NUMBER,
+    min_ingestts TIMESTAMP_NTZ,
+    max_ingestts TIMESTAMP_NTZ,
+    triggered_at TIMESTAMP_LTZ,
+    compile_skipped BOOLEAN,
+    project_version STRING,
+    dbt_started_at TIMESTAMP_LTZ,
+    dbt_finished_at TIMESTAMP_LTZ,
+    dbt_runtime_seconds NUMBER(12, 3),
+    max_latency_seconds NUMBER(12, 3), -- oldest message in the batch to refreshed models
+    status STRING
+);
+
+-- Last project version compiled per target
+create table if not exists incm_dbt_compile_state (
+    target STRING,
+    project_version STRING,
+    compiled_at TIMESTAMP_LTZ
+);
+
+-- Consumes the stream so the batch is only triggered once
+create or replace task incm_root_triggered_incident_ingestion
+	warehouse=<% ctx.env.dbt_pipeline_wh %>
+	config='{"target": "<% ctx.env.dbt_target %>"}'
+	when SYSTEM$STREAM_HAS_DATA('<% ctx.env.dbt_project_database %>.bronze_zone.slack_messages_stream')
+	as
+  insert into incm_incident_ingestion_runs (run_group_id, batch_rows, min_ingestts, max_ingestts, triggered_at, status)
+  select 
+    SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'),
+    count(*),
+    min(ingestts),
+    max(ingestts),
+    current_timestamp(),
+    'running'
+  from <% ctx.env.dbt_project_database %>.bronze_zone.slack_messages_stream;
+
+create or replace task incm_incident_ingestion_compile
+	warehouse=<% ctx.env.dbt_pipeline_wh %>
+	after incm_root_triggered_incident_ingestion
+	as 
+  EXECUTE IMMEDIATE
+  $$
+    DECLARE
+      _project_version STRING;
+      _compiled_version STRING;
+      _compile_skipped BOOLEAN DEFAULT TRUE;
+    BEGIN
+      LET _target := (SELECT SYSTEM$GET_TASK_GRAPH_CONFIG('target'));
+      LET _run_group_id := (SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'));
+
+      SHOW VERSIONS IN DBT PROJECT <% ctx.env.dbt_project_name %>;
+      SELECT "name" INTO :_project_version 
+      FROM TABLE(RESULT_SCAN(LAST_QUERY_ID())) 
+      ORDER BY "created_on" DESC LIMIT 1;
+
+      SELECT max(project_version) INTO :_compiled_version 
+      FROM incm_dbt_compile_state 
+      WHERE target = :_target;
+
+      IF (_compiled_version IS NULL OR _compiled_version != _project_version) THEN
+        _compile_skipped := FALSE;
+        LET command := 'compile --target '|| _target;
+        EXECUTE DBT PROJECT <% ctx.env.dbt_project_name %> args=:command;
+
+        MERGE INTO incm_dbt_compile_state s
+        USING (SELECT :_target AS target, :_project_version AS project_version) v
+        ON s.target = v.target
+        WHEN MATCHED THEN UPDATE SET project_version = v.project_version, compiled_at = current_timestamp()
+        WHEN NOT MATCHED THEN INSERT (target, project_version, compiled_at) VALUES (v.target, v.project_version, current_timestamp());
+      END IF;
+
+      UPDATE incm_incident_ingestion_runs 
+      SET compile_skipped = :_compile_skipped, project_version = :_project_version
+      WHERE run_group_id = :_run_group_id;
+    END;
+  $$
+  ;
+
+create or replace task incm_incident_ingestion_refresh
+	warehouse=<% ctx.env.dbt_pipeline_wh %>
+	after incm_incident_ingestion_compile
+	as 
+  EXECUTE IMMEDIATE
+  $$
+    DECLARE
+      _run_group_id STRING;
+      _started_at TIMESTAMP_LTZ;
+      _acquired BOOLEAN;
+    BEGIN
+      LET _target := (SELECT SYSTEM$GET_TASK_GRAPH_CONFIG('target'));
+      _run_group_id := (SELECT SYSTEM$TASK_RUNTIME_INFO('CURRENT_TASK_GRAPH_RUN_GROUP_ID'));
+
+      -- The daily run covers the same models; if it holds the lock for too long this batch is skipped,
+      -- which is safe because the models read the per channel watermarks rather than the stream
+      CALL incm_acquire_dbt_run_lock('incident_models', :_run_group_id, 300) INTO :_acquired;
+      IF (NOT _acquired) THEN
+        UPDATE incm_incident_ingestion_runs 
+        SET status = 'skipped'
+        WHERE run_group_id = :_run_group_id;
+        RETURN 'skipped: incm_dbt_run_lock held by another run';
+      END IF;
+      _started_at := (SELECT current_timestamp());
+
+      -- Intersection of the Slack messages lineage and the daily tag; trend rollups are left to the daily run
+      LET command := 'run --select source:bronze_zone.slack_messages+,tag:daily --exclude tag:trends --target '|| _target;
+      EXECUTE DBT PROJECT <% ctx.env.dbt_project_name %> args=:command;
+
+      UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'incident_models' AND holder = :_run_group_id;
+
+      -- ingestts is UTC without a time zone, so latency is measured against the current UTC wall clock
+      UPDATE incm_incident_ingestion_runs 
+      SET dbt_started_at = :_started_at,
+          dbt_finished_at = current_timestamp(),
+          dbt_runtime_seconds = datediff('millisecond', :_started_at, current_timestamp()) / 1000,
+          max_latency_seconds = datediff('millisecond', min_ingestts, sysdate()) / 1000,
+          status = 'succeeded'
+      WHERE run_group_id = :_run_group_id;
+    EXCEPTION
+      WHEN OTHER THEN
+        UPDATE incm_dbt_run_lock SET holder = NULL, acquired_at = NULL WHERE lock_name = 'incident_models' AND holder = :_run_group_id;
+        UPDATE incm_incident_ingestion_runs 
+        SET dbt_started_at = :_started_at, dbt_finished_at = current_timestamp(), status = 'failed'
+        WHERE run_group_id = :_run_group_id;
+        RAISE;
     END;
   $$
   ;
 
+-- Fallback schedule for the micro-batch graph
+-- Messages that land while a batch is running do not trigger another run, so they would wait for the
+-- next message or the daily run; this re-triggers the graph on a short schedule while the stream still
+-- has data (a graph that is still running skips the extra run, and the next tick tries again)
+create or replace task incm_incident_ingestion_fallback
+	warehouse=<% ctx.env.dbt_pipeline_wh %>
+	schedule='<% ctx.env.incident_ingestion_fallback_schedule %>'
+	as
+  EXECUTE IMMEDIATE
+  $$
+    DECLARE
+      _has_stream BOOLEAN;
+    BEGIN
+      CALL incm_ensure_slack_messages_stream() INTO :_has_stream;
+      IF (NOT _has_stream) THEN
+        RETURN 'skipped: bronze_zone.slack_messages does not exist yet';
+      END IF;
+
+      LET _has_data BOOLEAN := (SELECT SYSTEM$STREAM_HAS_DATA('<% ctx.env.dbt_project_database %>.bronze_zone.slack_messages_stream'));
+      IF (NOT _has_data) THEN
+        RETURN 'skipped: no pending messages';
+      END IF;
+
+      EXECUTE TASK incm_root_triggered_incident_ingestion;
+      RETURN 'triggered incm_root_triggered_incident_ingestion';
+    END;
+  $$
+  ;
 
 -- One off operations to deploy Cortex Services and Semantic Views
 create or replace task incm_root_deploy_cortex_services
@@ -2,23 +2,67 @@
 Incident Management Dashboard - Single Page Streamlit Application
 """
 
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import io
 import json
-from typing import List, Optional
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
 import streamlit as st
 from datetime import datetime, timedelta
 import pandas as pd
+from PIL import Image
 from snowflake.snowpark.session import Session
 from snowflake.snowpark.context import get_active_session
 from snowflake.core import Root
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 import os
 
 # Constants and utilities merged from app_utils.py
 API_TIMEOUT = 50000  # in milliseconds
+INFERENCE_API_ENDPOINT = "/api/v2/cortex/inference:complete"
+ANALYST_API_ENDPOINT = "/api/v2/cortex/analyst/message"
 FEEDBACK_API_ENDPOINT = "/api/v2/cortex/analyst/feedback"
 
+# Cortex REST client
+CORTEX_DEFAULT_TIMEOUT = (5, API_TIMEOUT / 1000)  # (connect, read) in seconds
+CORTEX_ENDPOINT_TIMEOUTS = {
+    INFERENCE_API_ENDPOINT: (5, 120),
+    ANALYST_API_ENDPOINT: (5, API_TIMEOUT / 1000),
+    FEEDBACK_API_ENDPOINT: (5, 10),
+}
+CORTEX_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Only these endpoints are safe to replay; Analyst messages and feedback are only retried when the request was never accepted
+CORTEX_IDEMPOTENT_ENDPOINTS = (INFERENCE_API_ENDPOINT,)
+CORTEX_REJECTED_STATUS_CODES = (429,)
+CORTEX_MAX_RETRIES = 3
+CORTEX_BACKOFF_FACTOR = 0.5  # in seconds
+CORTEX_POOL_MAXSIZE = 10
+
+# Attachment thumbnail cache
+ATTACHMENT_THUMBNAIL_SIZE = (300, 300)  # in pixels
+ATTACHMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+ATTACHMENT_FETCH_WORKERS = 4
+
+# Cortex Analyst response cache
+ANALYST_CACHE_MAX_ENTRIES = 128
+ANALYST_RESULT_TTL = 24 * 60 * 60  # in seconds, results are also dropped when the semantic view tables change
+
+# Query result cache
+QUERY_CACHE_MAX_ENTRIES = 256
+QUERY_CACHE_DEFAULT_TTL = 300  # in seconds
+QUERY_CACHE_FRESHNESS_CHECK_INTERVAL = 30  # in seconds
+
+# Dashboard rendering
+PREFETCH_PANELS = True  # run independent panel queries concurrently before rendering
+PREFETCH_MAX_WORKERS = 4
+SHOW_PANEL_SKELETONS = True  # show a placeholder per panel while its query is running
+
 
 class SnowflakeConnectionException(Exception):
     """Custom exception for Snowflake connection errors."""
@@ -94,27 +138,401 @@ def connect_to_snowflake(**kwargs):
     return session, root
 
 
-def execute_sql(sql: str, session: Session) -> pd.DataFrame:
-    rows = session.sql(sql).collect()
-    res = []
-    for row in rows:
-        res.append(row.as_dict(True))
-    return pd.DataFrame(res)
+def _coerce_dtypes(df: pd.DataFrame, dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    # Only coerce the columns that are actually present in the result
+    if not dtypes:
+        return df
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
 
 
-def ask_cortex(prompt: str, session: Session, model: str = "claude-4-sonnet") -> str:
-    # Send a POST request to the Cortex Inference API endpoint
-    HOST = os.getenv("SNOWFLAKE_HOST", f'{session.get_current_account()}.snowflakecomputing.com')
-    PAT = os.getenv("SNOWFLAKE_USER_PAT")
-
-    resp = requests.post(
-        url=f"https://{HOST}/api/v2/cortex/inference:complete",
-        json={"messages": [{"role": "user", "content": prompt}], "model": model, "stream": False},
-        headers={
-            "Authorization": f'Bearer {PAT}',
+def _sql_dataframe(sql: str, session: Session, max_rows: Optional[int] = None, params: Optional[List] = None):
+    # Bound parameters keep the query text stable, so result and compile caches can be reused
+    sp_df = session.sql(sql, params=params) if params else session.sql(sql)
+    if max_rows is not None:
+        sp_df = sp_df.limit(max_rows)
+    return sp_df
+
+
+def execute_sql(
+    sql: str,
+    session: Session,
+    columnar: bool = True,
+    max_rows: Optional[int] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    params: Optional[List] = None,
+) -> pd.DataFrame:
+    """
+    Execute a query and return the result as a pandas DataFrame.
+
+    By default the result is fetched in Arrow format and converted to pandas column by column.
+    Set columnar=False to build the DataFrame from Row objects instead.
+
+    Args:
+        sql: Query text
+        session: Snowpark session
+        columnar: Fetch the result through Arrow instead of collecting Rows
+        max_rows: Optional row limit applied on the server
+        dtypes: Optional column name to dtype mapping applied to the result
+        params: Optional values bound to the ? placeholders of the query
+    """
+    sp_df = _sql_dataframe(sql, session, max_rows, params)
+    if columnar:
+        df = sp_df.to_pandas()
+    else:
+        df = pd.DataFrame([row.as_dict(True) for row in sp_df.collect()])
+    return _coerce_dtypes(df, dtypes)
+
+
+def execute_sql_batches(
+    sql: str,
+    session: Session,
+    max_rows: Optional[int] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    arrow: bool = False,
+    params: Optional[List] = None,
+) -> Iterator:
+    """
+    Execute a query and yield the result one Arrow result batch at a time.
+
+    Yields pandas DataFrames, or pyarrow Tables when arrow=True (dtypes are ignored for Arrow batches).
+    """
+    sp_df = _sql_dataframe(sql, session, max_rows, params)
+    if arrow:
+        yield from sp_df.to_arrow_batches()
+        return
+    for batch in sp_df.to_pandas_batches():
+        yield _coerce_dtypes(batch, dtypes)
+
+
+@dataclass
+class CachedQueryResult:
+    df: pd.DataFrame
+    expires_at: float
+    change_tokens: Dict[str, Optional[str]]
+
+
+class QueryResultCache:
+    """
+    LRU cache of query results shared by every session of the app.
+
+    Entries are keyed by the normalized query text and its bound parameters plus the current role, database
+    and warehouse of the session that ran it.
+    Each entry expires after its own TTL, and is dropped early when one of the tables it depends on
+    reports a new SYSTEM$LAST_CHANGE_COMMIT_TIME. Change tokens are re-checked at most once per
+    freshness_check_interval with a single metadata query, run outside the cache lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        default_ttl: int = QUERY_CACHE_DEFAULT_TTL,
+        freshness_check_interval: int = QUERY_CACHE_FRESHNESS_CHECK_INTERVAL,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.freshness_check_interval = freshness_check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, CachedQueryResult]" = OrderedDict()
+        self._change_tokens: Dict[str, Optional[str]] = {}
+        self._tokens_checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def normalize_sql(sql: str) -> str:
+        # Only used as a cache key, so collapsing whitespace inside literals is harmless
+        return " ".join(sql.split()).rstrip(";").strip()
+
+    @staticmethod
+    def _session_scope(session: Session) -> tuple:
+        # Resolved on every call so a session that switches role, database or warehouse never reuses
+        # another scope's results; Snowpark reads these from the connection's session state
+        return (session.get_current_role(), session.get_current_database(), session.get_current_warehouse())
+
+    def _current_change_tokens(self, session: Session, tables: tuple) -> Dict[str, Optional[str]]:
+        if not tables:
+            return {}
+
+        with self._lock:
+            now = time.monotonic()
+            untracked = [t for t in tables if t not in self._change_tokens]
+            if not untracked and now - self._tokens_checked_at < self.freshness_check_interval:
+                return {t: self._change_tokens.get(t) for t in tables}
+            tracked = sorted(set(self._change_tokens) | set(tables))
+
+        # The metadata query runs outside the lock so concurrent prefetches do not queue behind it
+        select_list = ", ".join(f"SYSTEM$LAST_CHANGE_COMMIT_TIME('{t}')" for t in tracked)
+        try:
+            row = session.sql(f"SELECT {select_list}").collect()[0]
+            tokens = {t: str(v) for t, v in zip(tracked, row)}
+        except Exception:
+            # Fall back to TTL-only expiry when the change tokens cannot be read
+            tokens = {t: None for t in tracked}
+
+        with self._lock:
+            self._change_tokens = {**self._change_tokens, **tokens}
+            self._tokens_checked_at = now
+
+        return {t: tokens.get(t) for t in tables}
+
+    def execute(
+        self,
+        sql: str,
+        session: Session,
+        ttl: Optional[int] = None,
+        depends_on: Optional[List[str]] = None,
+        params: Optional[List] = None,
+    ) -> pd.DataFrame:
+        """Return the cached result for a query, running it only on a miss, expiry or upstream change."""
+        tables = tuple(sorted(depends_on or ()))
+        key = (self.normalize_sql(sql), tuple(params or ())) + self._session_scope(session)
+        change_tokens = self._current_change_tokens(session, tables)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic() and entry.change_tokens == change_tokens:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.df.copy()
+            self.misses += 1
+
+        df = execute_sql(sql, session, params=params)
+
+        with self._lock:
+            self._entries[key] = CachedQueryResult(
+                df=df,
+                expires_at=time.monotonic() + (self.default_ttl if ttl is None else ttl),
+                change_tokens=change_tokens,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return df.copy()
+
+    def invalidate(self, tables: Optional[List[str]] = None):
+        """Drop every cached result, or only those that depend on one of the given tables."""
+        with self._lock:
+            if tables is None:
+                self._entries.clear()
+                self._change_tokens.clear()
+                return
+            stale = set(tables)
+            for key in [k for k, v in self._entries.items() if stale & set(v.change_tokens)]:
+                del self._entries[key]
+            for t in stale:
+                self._change_tokens.pop(t, None)
+
+
+@st.cache_resource
+def get_query_cache() -> QueryResultCache:
+    return QueryResultCache()
+
+
+def execute_cached_sql(
+    sql: str,
+    session: Session,
+    ttl: Optional[int] = None,
+    depends_on: Optional[List[str]] = None,
+    cache: Optional[QueryResultCache] = None,
+    params: Optional[List] = None,
+) -> pd.DataFrame:
+    # Worker threads have no script run context, so they pass the cache in explicitly
+    cache = cache if cache is not None else get_query_cache()
+    return cache.execute(sql, session, ttl=ttl, depends_on=depends_on, params=params)
+
+
+def in_list_params(values: List) -> tuple:
+    """
+    Build the ? placeholders and bind values for an IN (...) list.
+
+    Values are de-duplicated and sorted, and the list is padded to the next power of two by repeating
+    the last value, so lookups for any number of keys share a handful of query texts.
+    """
+    values = sorted(dict.fromkeys(values))
+    size = 1
+    while size < len(values):
+        size *= 2
+    return ", ".join(["?"] * size), values + [values[-1]] * (size - len(values))
+
+
+@dataclass
+class MetricTile:
+    """A KPI tile computed as a (conditional) row count over a single table."""
+    name: str
+    table: str
+    condition: Optional[str] = None
+
+
+@dataclass
+class MetricsResult:
+    values: Dict[str, int]
+    timings: Dict[str, float]  # in seconds, per tile; only measured when profiling (one query per tile)
+    elapsed: float  # in seconds, for the whole metrics layer (the batched query when not profiling)
+    batched: bool
+
+
+DASHBOARD_METRIC_TILES = [
+    MetricTile("total_active", "active_incidents"),
+    MetricTile("critical_active", "active_incidents", "lower(priority) = 'critical'"),
+    MetricTile("high_active", "active_incidents", "lower(priority) = 'high'"),
+    MetricTile("closed_30_days", "closed_incidents", "closed_at >= DATEADD('day', -30, CURRENT_DATE())"),
+]
+
+
+def build_metrics_query(tiles: List[MetricTile], database: str, schema: str = "gold_zone") -> str:
+    """
+    Build a single query that computes every tile.
+
+    Tiles over the same table share one conditional aggregation scan, and the per-table
+    aggregates are cross joined into a single row with one column per tile.
+    """
+    tables = list(dict.fromkeys(tile.table for tile in tiles))
+    subqueries = []
+    for idx, table in enumerate(tables):
+        aggregates = ", ".join(
+            f"COUNT_IF({tile.condition}) AS {tile.name}" if tile.condition else f"COUNT(*) AS {tile.name}"
+            for tile in tiles
+            if tile.table == table
+        )
+        subqueries.append(f"(SELECT {aggregates} FROM {database}.{schema}.{table}) t{idx}")
+    return "SELECT * FROM " + " CROSS JOIN ".join(subqueries)
+
+
+def metrics_profiling_enabled() -> bool:
+    return st.query_params.get("profile_metrics", "false").lower() == "true"
+
+
+def fetch_metrics(
+    session: Session,
+    tiles: List[MetricTile] = DASHBOARD_METRIC_TILES,
+    schema: str = "gold_zone",
+    profile: bool = False,
+    cache: Optional[QueryResultCache] = None,
+) -> MetricsResult:
+    """
+    Compute all metric tiles in one round trip.
+
+    With profile=True every tile is queried on its own (uncached) so each one gets its own timing;
+    otherwise only the round trip time of the batched query is reported, as elapsed.
+    """
+    database = session.get_current_database()
+    started = time.perf_counter()
+
+    if profile:
+        values, timings = {}, {}
+        for tile in tiles:
+            tile_started = time.perf_counter()
+            df = execute_sql(build_metrics_query([tile], database, schema), session)
+            timings[tile.name] = time.perf_counter() - tile_started
+            values[tile.name] = int(df[tile.name.upper()][0])
+        return MetricsResult(values=values, timings=timings, elapsed=time.perf_counter() - started, batched=False)
+
+    df = execute_cached_sql(
+        build_metrics_query(tiles, database, schema),
+        session,
+        ttl=60,
+        depends_on=[f"{database}.{schema}.{table}" for table in dict.fromkeys(tile.table for tile in tiles)],
+        cache=cache,
+    )
+    elapsed = time.perf_counter() - started
+    return MetricsResult(
+        values={tile.name: int(df[tile.name.upper()][0]) for tile in tiles},
+        timings={},
+        elapsed=elapsed,
+        batched=True,
+    )
+
+
+def resolve_cortex_host(session: Session) -> str:
+    return os.getenv("SNOWFLAKE_HOST", f'{session.get_current_account()}.snowflakecomputing.com')
+
+
+class CortexRestClient:
+    """
+    Keep-alive client for the Cortex REST APIs (Inference, Analyst and Analyst Feedback).
+
+    Connections are pooled on a single requests.Session, the host and auth headers are resolved once,
+    and every endpoint has its own (connect, read) timeout. Connection errors and 429 responses are
+    retried with exponential backoff (honouring Retry-After); 5xx responses are only retried on the
+    idempotent endpoints. Read timeouts are never retried, so a slow call is bounded by its own timeout
+    and a request the server may already have processed is not replayed.
+
+    Args:
+        host: Account host, optionally with a port (e.g. localhost:8080 for a stub server)
+        token: Programmatic Access Token
+        scheme: URL scheme, http is only meant for local stub servers
+        timeouts: Endpoint to (connect, read) timeout mapping in seconds
+        max_retries: Retries on connection errors and retryable status codes (never on read timeouts)
+        backoff_factor: Base of the exponential backoff between retries in seconds
+        pool_maxsize: Maximum number of pooled connections to the host
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: Optional[str],
+        scheme: str = "https",
+        timeouts: Optional[Dict[str, tuple]] = None,
+        max_retries: int = CORTEX_MAX_RETRIES,
+        backoff_factor: float = CORTEX_BACKOFF_FACTOR,
+        pool_maxsize: int = CORTEX_POOL_MAXSIZE,
+    ):
+        self.base_url = f"{scheme}://{host}"
+        self.timeouts = {**CORTEX_ENDPOINT_TIMEOUTS, **(timeouts or {})}
+
+        def adapter(status_codes: tuple) -> HTTPAdapter:
+            retry = Retry(
+                total=max_retries,
+                connect=max_retries,
+                read=0,
+                status=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=status_codes,
+                allowed_methods=frozenset(["POST"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            return HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        # requests picks the adapter with the longest matching prefix
+        self.http = requests.Session()
+        non_idempotent = adapter(CORTEX_REJECTED_STATUS_CODES)
+        self.http.mount("https://", non_idempotent)
+        self.http.mount("http://", non_idempotent)
+        idempotent = adapter(CORTEX_RETRY_STATUS_CODES)
+        for endpoint in CORTEX_IDEMPOTENT_ENDPOINTS:
+            self.http.mount(f"{self.base_url}{endpoint}", idempotent)
+        self.http.headers.update({
+            "Authorization": f'Bearer {token}',
             "X-Snowflake-Authorization-Token-Type": "PROGRAMMATIC_ACCESS_TOKEN",
             "Content-Type": "application/json",
-        },
+        })
+
+    def post(self, endpoint: str, body: dict, **kwargs) -> requests.Response:
+        return self.http.post(
+            url=f"{self.base_url}{endpoint}",
+            json=body,
+            timeout=self.timeouts.get(endpoint, CORTEX_DEFAULT_TIMEOUT),
+            **kwargs,
+        )
+
+    def close(self):
+        self.http.close()
+
+
+@st.cache_resource
+def get_cortex_client(_session: Session) -> CortexRestClient:
+    # Host and PAT are resolved once per app process; every caller shares the connection pool
+    return CortexRestClient(host=resolve_cortex_host(_session), token=os.getenv("SNOWFLAKE_USER_PAT"))
+
+
+def ask_cortex(prompt: str, session: Session, model: str = "claude-4-sonnet", client: Optional[CortexRestClient] = None) -> str:
+    # Send a POST request to the Cortex Inference API endpoint
+    client = client if client is not None else get_cortex_client(session)
+    resp = client.post(
+        INFERENCE_API_ENDPOINT,
+        {"messages": [{"role": "user", "content": prompt}], "model": model, "stream": False},
     )
     try:
         response_body = resp.json()
@@ -123,7 +541,7 @@ def ask_cortex(prompt: str, session: Session, model: str = "claude-4-sonnet") ->
         return f"Error: {e}"
 
 
-def ask_cortex_analyst(prompt: str, session: Session, semantic_view: str) -> str:
+def ask_cortex_analyst(prompt: str, session: Session, semantic_view: str, client: Optional[CortexRestClient] = None) -> str:
     # Prepare the request body with the user's prompt
     request_body = {
         "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
@@ -131,18 +549,8 @@ def ask_cortex_analyst(prompt: str, session: Session, semantic_view: str) -> str
     }
 
     # Send a POST request to the Cortex Analyst API endpoint
-    HOST = os.getenv("SNOWFLAKE_HOST", f'{session.get_current_account()}.snowflakecomputing.com')
-    PAT = os.getenv("SNOWFLAKE_USER_PAT")
-    
-    resp = requests.post(
-        url=f"https://{HOST}/api/v2/cortex/analyst/message",
-        json=request_body,
-        headers={
-            "Authorization": f'Bearer {PAT}',
-            "X-Snowflake-Authorization-Token-Type": "PROGRAMMATIC_ACCESS_TOKEN",
-            "Content-Type": "application/json",
-        },
-    )
+    client = client if client is not None else get_cortex_client(session)
+    resp = client.post(ANALYST_API_ENDPOINT, request_body)
     
     if resp.status_code < 400:
         request_id = resp.headers.get("X-Snowflake-Request-Id")
@@ -160,7 +568,280 @@ def ask_cortex_analyst(prompt: str, session: Session, semantic_view: str) -> str
         raise Exception(error_msg)
 
 
-def submit_feedback(session: Session, request_id: str, positive: bool, feedback_message: str) -> Optional[str]:
+@dataclass
+class StreamStats:
+    """Latency metrics and trailing metadata collected while a Cortex response is streamed."""
+    started_at: float = 0.0
+    time_to_first_token: Optional[float] = None  # in seconds
+    total_latency: Optional[float] = None  # in seconds
+    tokens: int = 0
+    request_id: Optional[str] = None
+    sql: str = ""
+    statuses: List[str] = field(default_factory=list)
+
+
+def iter_sse_events(resp: requests.Response) -> Iterator[tuple]:
+    """Parse a server-sent event stream incrementally into (event, data) tuples."""
+    resp.encoding = "utf-8"
+    event, data = "message", []
+    for line in resp.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line:
+            # A blank line dispatches the buffered event
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            name, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if name == "event":
+                event = value
+            elif name == "data":
+                data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
+def _raise_for_stream_error(resp: requests.Response, api: str):
+    if resp.status_code >= 400:
+        request_id = resp.headers.get("X-Snowflake-Request-Id")
+        raise Exception(f"""
+                    🚨 An {api} API error has occurred 🚨
+
+                    * response code: `{resp.status_code}`
+                    * request-id: `{request_id}`
+                    * error: `{resp.text}`
+            """)
+
+
+def _record_token(stats: StreamStats, text: str) -> str:
+    if stats.time_to_first_token is None:
+        stats.time_to_first_token = time.perf_counter() - stats.started_at
+    stats.tokens += 1
+    return text
+
+
+def stream_cortex(
+    prompt: str,
+    session: Session,
+    model: str = "claude-4-sonnet",
+    stats: Optional[StreamStats] = None,
+    client: Optional[CortexRestClient] = None,
+) -> Iterator[str]:
+    """
+    Stream a Cortex Inference completion token by token, e.g. st.write_stream(stream_cortex(...)).
+
+    Pass a StreamStats instance to collect time-to-first-token and total latency.
+    """
+    stats = stats if stats is not None else StreamStats()
+    stats.started_at = time.perf_counter()
+    client = client if client is not None else get_cortex_client(session)
+
+    with client.post(
+        INFERENCE_API_ENDPOINT,
+        {"messages": [{"role": "user", "content": prompt}], "model": model, "stream": True},
+        stream=True,
+        headers={"Accept": "text/event-stream"},
+    ) as resp:
+        _raise_for_stream_error(resp, "Inference")
+        stats.request_id = resp.headers.get("X-Snowflake-Request-Id")
+
+        for event, data in iter_sse_events(resp):
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            for choice in chunk.get("choices", []):
+                delta = choice.get("delta", {})
+                text = delta.get("content") or delta.get("text")
+                if text:
+                    yield _record_token(stats, text)
+
+    stats.total_latency = time.perf_counter() - stats.started_at
+
+
+def stream_cortex_analyst(
+    prompt: str,
+    session: Session,
+    semantic_view: str,
+    stats: Optional[StreamStats] = None,
+    client: Optional[CortexRestClient] = None,
+) -> Iterator[str]:
+    """
+    Stream the text of a Cortex Analyst answer as it is generated.
+
+    The generated SQL, the status updates and the request id (for feedback) are collected on stats.
+    """
+    stats = stats if stats is not None else StreamStats()
+    stats.started_at = time.perf_counter()
+    client = client if client is not None else get_cortex_client(session)
+
+    request_body = {
+        "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
+        "semantic_view": f"{semantic_view}",
+        "stream": True,
+    }
+    with client.post(ANALYST_API_ENDPOINT, request_body, stream=True, headers={"Accept": "text/event-stream"}) as resp:
+        _raise_for_stream_error(resp, "Analyst")
+        stats.request_id = resp.headers.get("X-Snowflake-Request-Id")
+
+        for event, data in iter_sse_events(resp):
+            if event == "done":
+                break
+            payload = json.loads(data)
+            if event == "status":
+                stats.statuses.append(payload.get("status"))
+            elif event == "message.content.delta":
+                if payload.get("type") == "text" and payload.get("text_delta"):
+                    yield _record_token(stats, payload["text_delta"])
+                elif payload.get("type") == "sql":
+                    stats.sql += payload.get("statement_delta", "")
+            elif event == "error":
+                raise Exception(f"""
+                    🚨 An Analyst API error has occurred 🚨
+
+                    * request-id: `{payload.get('request_id', stats.request_id)}`
+                    * error code: `{payload.get('error_code')}`
+                    * error: `{payload.get('message')}`
+            """)
+
+    stats.total_latency = time.perf_counter() - stats.started_at
+
+
+@dataclass
+class AnalystCacheEntry:
+    response: dict
+    request_id: Optional[str]
+    sql: Optional[str]
+    tables: List[str]
+
+
+class AnalystResponseCache:
+    """
+    LRU cache of Cortex Analyst answers keyed by normalized prompt, semantic view and the session's role,
+    database and warehouse (the query result cache scope), so an answer is never served to another role.
+    Only answers that contain SQL are cached; errors and clarifying questions are asked again.
+
+    Only the generated SQL and the request id (for feedback) are kept here. Executing the SQL goes through
+    the query result cache with the semantic view's base tables as dependencies, so a repeated question
+    costs no LLM call and only re-runs on the warehouse once one of those tables has changed.
+    """
+
+    def __init__(self, max_entries: int = ANALYST_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, AnalystCacheEntry]" = OrderedDict()
+        self._semantic_view_tables: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        return " ".join(prompt.lower().split()).rstrip("?.! ")
+
+    @staticmethod
+    def extract_sql(response: dict) -> Optional[str]:
+        for content in response.get("message", {}).get("content", []):
+            if content.get("type") == "sql":
+                return content.get("statement")
+        return None
+
+    def semantic_view_tables(self, session: Session, semantic_view: str) -> List[str]:
+        """Resolve (once per semantic view) the fully qualified base tables it is defined over."""
+        with self._lock:
+            if semantic_view in self._semantic_view_tables:
+                return self._semantic_view_tables[semantic_view]
+
+        tables = {}
+        try:
+            for row in session.sql(f"DESCRIBE SEMANTIC VIEW {semantic_view}").collect():
+                row = row.as_dict()
+                if row.get("object_kind") == "TABLE" and str(row.get("property", "")).startswith("BASE_TABLE_"):
+                    tables.setdefault(row["object_name"], {})[row["property"]] = row["property_value"]
+        except Exception:
+            # Without the base tables, results fall back to TTL-only expiry
+            pass
+
+        resolved = sorted(
+            f"{t['BASE_TABLE_DATABASE_NAME']}.{t['BASE_TABLE_SCHEMA_NAME']}.{t['BASE_TABLE_NAME']}"
+            for t in tables.values()
+            if {"BASE_TABLE_DATABASE_NAME", "BASE_TABLE_SCHEMA_NAME", "BASE_TABLE_NAME"} <= set(t)
+        )
+        with self._lock:
+            self._semantic_view_tables[semantic_view] = resolved
+        return resolved
+
+    def ask(
+        self,
+        prompt: str,
+        session: Session,
+        semantic_view: str,
+        execute: bool = True,
+        client: Optional[CortexRestClient] = None,
+        query_cache: Optional[QueryResultCache] = None,
+    ) -> dict:
+        """
+        Answer a question from the cache, calling Cortex Analyst only on a miss.
+
+        Returns the Analyst response with request_id, sql, cache_hit and (when execute=True and the answer
+        contains SQL) the query result as a DataFrame under result.
+        """
+        key = (self.normalize_prompt(prompt), semantic_view.upper()) + QueryResultCache._session_scope(session)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        cache_hit = entry is not None
+        if entry is None:
+            response = ask_cortex_analyst(prompt, session, semantic_view, client=client)
+            entry = AnalystCacheEntry(
+                response=response,
+                request_id=response.get("request_id"),
+                sql=self.extract_sql(response),
+                tables=self.semantic_view_tables(session, semantic_view),
+            )
+            if entry.sql:
+                with self._lock:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+
+        result = None
+        if execute and entry.sql:
+            result = execute_cached_sql(
+                entry.sql, session, ttl=ANALYST_RESULT_TTL, depends_on=entry.tables, cache=query_cache
+            )
+
+        return {**entry.response, "request_id": entry.request_id, "sql": entry.sql, "cache_hit": cache_hit, "result": result}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._semantic_view_tables.clear()
+
+
+@st.cache_resource
+def get_analyst_cache() -> AnalystResponseCache:
+    return AnalystResponseCache()
+
+
+def ask_cortex_analyst_cached(prompt: str, session: Session, semantic_view: str, execute: bool = True) -> dict:
+    return get_analyst_cache().ask(prompt, session, semantic_view, execute=execute)
+
+
+def submit_feedback(session: Session, request_id: str, positive: bool, feedback_message: str, client: Optional[CortexRestClient] = None) -> Optional[str]:
     request_body = {
         "request_id": request_id,
         "positive": positive,
@@ -168,19 +849,8 @@ def submit_feedback(session: Session, request_id: str, positive: bool, feedback_
     }
     
     # Send a POST request to the Cortex Analyst API endpoint
-    HOST = os.getenv("SNOWFLAKE_HOST", f'{session.get_current_account()}.snowflakecomputing.com')
-    PAT = os.getenv("SNOWFLAKE_USER_PAT")
-
-    resp = requests.post(
-        url=f"https://{HOST}/api/v2/cortex/analyst/feedback",
-        json=request_body,
-        headers={
-            "Authorization": f'Bearer {PAT}',
-            "X-Snowflake-Authorization-Token-Type": "PROGRAMMATIC_ACCESS_TOKEN",
-            "Content-Type": "application/json",
-        },
-        timeout=API_TIMEOUT
-    )
+    client = client if client is not None else get_cortex_client(session)
+    resp = client.post(FEEDBACK_API_ENDPOINT, request_body)
     
     if resp.status_code == 200:
         return None
@@ -257,23 +927,22 @@ def create_header():
         </div>
         """, unsafe_allow_html=True)
 
-def create_metrics_cards():
+def create_metrics_cards(prefetched: Optional[Future] = None):
     """Create key metrics cards"""
 
     try:
-        database = st.session_state.snowpark_session.get_current_database()
-        schema = "gold_zone"
-        
-        # Calculate current metrics
-        total_active = execute_sql(f"SELECT COUNT(*) as count FROM {database}.{schema}.active_incidents", st.session_state.snowpark_session)
-        critical_count = execute_sql(f"SELECT COUNT(*) as count FROM {database}.{schema}.active_incidents WHERE lower(priority) = 'critical'", st.session_state.snowpark_session)
-        high_count = execute_sql(f"SELECT COUNT(*) as count FROM {database}.{schema}.active_incidents WHERE lower(priority) = 'high'", st.session_state.snowpark_session)
-        closed_count = execute_sql(f"SELECT COUNT(*) as count FROM {database}.{schema}.closed_incidents WHERE closed_at >= DATEADD('day', -30, CURRENT_DATE())", st.session_state.snowpark_session)
+        # Calculate current metrics in a single round trip
+        if prefetched is not None:
+            metrics = prefetched.result()
+        else:
+            metrics = fetch_metrics(st.session_state.snowpark_session, profile=metrics_profiling_enabled())
     except Exception as e:
-        total_active = pd.DataFrame({"COUNT": 0}, index=[0])
-        critical_count = pd.DataFrame({"COUNT": 0}, index=[0])
-        high_count = pd.DataFrame({"COUNT": 0}, index=[0])
-        closed_count = pd.DataFrame({"COUNT": 0}, index=[0])
+        metrics = MetricsResult(
+            values={tile.name: 0 for tile in DASHBOARD_METRIC_TILES},
+            timings={},
+            elapsed=0.0,
+            batched=True,
+        )
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -291,7 +960,7 @@ def create_metrics_cards():
             <h1 style="margin: 15px 0 10px 0; color: #dc2626; font-size: 3rem; font-weight: 700;">{}</h1>
             <p style="margin: 0; color: #991b1b; font-size: 0.85rem; font-weight: 500;">Immediate attention required</p>
         </div>
-        """.format(critical_count['COUNT'][0]), unsafe_allow_html=True)
+        """.format(metrics.values['critical_active']), unsafe_allow_html=True)
     
     with col2:
         st.markdown("""
@@ -307,7 +976,7 @@ def create_metrics_cards():
             <h1 style="margin: 15px 0 10px 0; color: #f59e0b; font-size: 3rem; font-weight: 700;">{}</h1>
             <p style="margin: 0; color: #92400e; font-size: 0.85rem; font-weight: 500;">Requires urgent action</p>
         </div>
-        """.format(high_count['COUNT'][0]), unsafe_allow_html=True)
+        """.format(metrics.values['high_active']), unsafe_allow_html=True)
     
     with col3:
         st.markdown("""
@@ -323,7 +992,7 @@ def create_metrics_cards():
             <h1 style="margin: 15px 0 10px 0; color: #3b82f6; font-size: 3rem; font-weight: 700;">{}</h1>
             <p style="margin: 0; color: #1e40af; font-size: 0.85rem; font-weight: 500;">Currently being worked on</p>
         </div>
-        """.format(total_active['COUNT'][0]), unsafe_allow_html=True)
+        """.format(metrics.values['total_active']), unsafe_allow_html=True)
     
     with col4:
         st.markdown("""
@@ -339,14 +1008,79 @@ def create_metrics_cards():
             <h1 style="margin: 15px 0 10px 0; color: #10b981; font-size: 3rem; font-weight: 700;">{}</h1>
             <p style="margin: 0; color: #065f46; font-size: 0.85rem; font-weight: 500;">Successfully resolved</p>
         </div>
-        """.format(closed_count['COUNT'][0]), unsafe_allow_html=True)
-    
+        """.format(metrics.values['closed_30_days']), unsafe_allow_html=True)
 
-def create_charts():
-    """Create dashboard charts using real data from the database"""
-    
-    database = st.session_state.snowpark_session.get_current_database()
+    # Per tile timings, enabled with ?profile_metrics=true; a batched result only has the batch time
+    if metrics_profiling_enabled():
+        with st.expander("⏱️ Metrics timing", expanded=True):
+            if metrics.batched:
+                st.caption(f"Batch query (all tiles): {metrics.elapsed * 1000:.0f} ms")
+            else:
+                st.caption(f"Total: {metrics.elapsed * 1000:.0f} ms (one query per tile)")
+            if metrics.timings:
+                st.dataframe(
+                    pd.DataFrame(
+                        [{"TILE": name, "ELAPSED_MS": round(seconds * 1000, 1)} for name, seconds in metrics.timings.items()]
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+
+def fetch_monthly_trends(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch the last 12 months from the incrementally maintained monthly rollup"""
+    database = session.get_current_database()
     schema = "gold_zone"
+    return execute_cached_sql(f"""
+        SELECT 
+            month,
+            total_incidents,
+            critical_incidents,
+            high_incidents
+        FROM {database}.{schema}.monthly_incident_trends
+        ORDER BY month DESC
+        LIMIT 12
+    """, session, ttl=900, depends_on=[f"{database}.{schema}.monthly_incident_trends"], cache=cache)
+
+
+def fetch_weekly_trends(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch the last 12 weeks from the incrementally maintained weekly rollup"""
+    database = session.get_current_database()
+    schema = "gold_zone"
+    return execute_cached_sql(f"""
+        SELECT 
+            week,
+            total_incidents,
+            critical_incidents,
+            high_incidents
+        FROM {database}.{schema}.weekly_incident_trends
+        ORDER BY week DESC
+        LIMIT 12
+    """, session, ttl=900, depends_on=[f"{database}.{schema}.weekly_incident_trends"], cache=cache)
+
+
+def fetch_incident_categories(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch incident counts per category to date from the monthly category rollup"""
+    database = session.get_current_database()
+    schema = "gold_zone"
+    return execute_cached_sql(f"""
+        SELECT 
+            category,
+            SUM(incident_count) as incident_count
+        FROM {database}.{schema}.incident_category_trends
+        GROUP BY category
+        ORDER BY incident_count DESC
+    """, session, ttl=900, depends_on=[f"{database}.{schema}.incident_category_trends"], cache=cache)
+
+
+def create_charts(
+    monthly_prefetched: Optional[Future] = None,
+    weekly_prefetched: Optional[Future] = None,
+    categories_prefetched: Optional[Future] = None,
+):
+    """Create dashboard charts from the trend rollups"""
+    
+    session = st.session_state.snowpark_session
     
     col1, col2, col3 = st.columns(3)
     
@@ -354,17 +1088,7 @@ def create_charts():
         st.subheader("📈 Monthly Incident Trends")
         try:
             # Get monthly trends data
-            monthly_query = f"""
-                SELECT 
-                    month,
-                    total_incidents,
-                    critical_incidents,
-                    high_priority_incidents
-                FROM {database}.{schema}.monthly_incident_trends
-                ORDER BY month DESC
-                LIMIT 12
-            """
-            monthly_df = execute_sql(monthly_query, st.session_state.snowpark_session)
+            monthly_df = monthly_prefetched.result() if monthly_prefetched is not None else fetch_monthly_trends(session)
             
             if not monthly_df.empty:
                 import altair as alt
@@ -392,17 +1116,7 @@ def create_charts():
         st.subheader("🎯 Weekly Incident Trends")
         try:
             # Get weekly trends data
-            weekly_query = f"""
-                SELECT 
-                    week,
-                    total_incidents,
-                    critical_incidents,
-                    high_incidents
-                FROM {database}.{schema}.weekly_incident_trends
-                ORDER BY week DESC
-                LIMIT 12
-            """
-            weekly_df = execute_sql(weekly_query, st.session_state.snowpark_session)
+            weekly_df = weekly_prefetched.result() if weekly_prefetched is not None else fetch_weekly_trends(session)
             
             if not weekly_df.empty:
                 import altair as alt
@@ -429,16 +1143,8 @@ def create_charts():
     with col3:
         st.subheader("🎯 Incidents by Category - To date")
         try:
-            # Get category breakdown from current incidents
-            category_query = f"""
-                SELECT 
-                    category,
-                    COUNT(*) as incident_count
-                FROM {database}.gold_zone.incidents
-                GROUP BY category
-                ORDER BY incident_count DESC
-            """
-            category_df = execute_sql(category_query, st.session_state.snowpark_session)
+            # Get category breakdown to date
+            category_df = categories_prefetched.result() if categories_prefetched is not None else fetch_incident_categories(session)
             
             if not category_df.empty:
                 import plotly.graph_objects as go
@@ -473,100 +1179,205 @@ def create_charts():
             st.error(f"Error loading category data: {str(e)}")
 
 
-def get_incident_attachments(incident_id):
-    """Fetch attachments for a specific incident"""
-    database = st.session_state.snowpark_session.get_current_database()
+def fetch_attachment_bytes(session: Session, attachment_file) -> bytes:
+    return session.file.get_stream(attachment_file, decompress=False).read()
+
+
+def make_thumbnail(data: bytes, size: tuple = ATTACHMENT_THUMBNAIL_SIZE) -> Optional[bytes]:
+    """Downscale an image to fit within size; returns None for bytes that are not a decodable image."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.thumbnail(size)
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA", "P"):
+                img.save(out, format="PNG", optimize=True)
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=85, optimize=True)
+            return out.getvalue()
+    except Exception:
+        return None
+
+
+class AttachmentThumbnailCache:
+    """
+    LRU of attachment thumbnails bounded by total byte size and shared by every session of the app.
+
+    Entries are keyed by attachment id plus upload time, so a replaced attachment is fetched again.
+    Only the downscaled thumbnail is kept; the full resolution file is fetched on demand and never cached.
+    """
+
+    def __init__(self, max_bytes: int = ATTACHMENT_CACHE_MAX_BYTES, max_workers: int = ATTACHMENT_FETCH_WORKERS):
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _put(self, key: tuple, thumbnail: bytes):
+        if len(thumbnail) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= len(self._entries.pop(key))
+            self._entries[key] = thumbnail
+            self.size_bytes += len(thumbnail)
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+
+    def get_thumbnails(self, session: Session, attachments: List[tuple]) -> Dict[tuple, Optional[bytes]]:
+        """
+        Return thumbnails for (key, attachment_file) pairs, fetching every miss in parallel.
+
+        A failed fetch is left out of the result instead of failing the whole incident. Attachments that
+        are not images map to None and are not cached, so the cache only ever holds downscaled images.
+        """
+        thumbnails, misses = {}, []
+        with self._lock:
+            for key, attachment_file in attachments:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    thumbnails[key] = self._entries[key]
+                    self.hits += 1
+                else:
+                    misses.append((key, attachment_file))
+                    self.misses += 1
+
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(misses))) as executor:
+                futures = {
+                    key: executor.submit(lambda f: make_thumbnail(fetch_attachment_bytes(session, f)), attachment_file)
+                    for key, attachment_file in misses
+                }
+            for key, future in futures.items():
+                if future.exception() is None:
+                    thumbnails[key] = future.result()
+                    if thumbnails[key] is not None:
+                        self._put(key, thumbnails[key])
+
+        return thumbnails
+
+
+@st.cache_resource
+def get_attachment_cache() -> AttachmentThumbnailCache:
+    return AttachmentThumbnailCache()
+
+
+def get_incidents_attachments(incident_ids: List[str], session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch attachments for several incidents in one round trip"""
+    if not incident_ids:
+        return pd.DataFrame()
+
+    database = session.get_current_database()
     schema = "gold_zone"
-    
-    # Query to get attachments for the incident
+    placeholders, params = in_list_params(incident_ids)
+
     query = f"""
     SELECT 
+        id,
+        incident_number,
         attachment_file,
         uploaded_at
     FROM {database}.{schema}.incident_attachments 
-    WHERE incident_number = '{incident_id}'
-    ORDER BY uploaded_at DESC
+    WHERE incident_number IN ({placeholders})
+    ORDER BY incident_number, uploaded_at DESC
+    """
+    return execute_cached_sql(query, session, depends_on=[f"{database}.{schema}.incident_attachments"], cache=cache, params=params)
+
+
+def get_incident_attachments(incident_id, visible_incident_ids: Optional[List[str]] = None):
+    """
+    Fetch attachments for a specific incident
+
+    When the ids of every incident on screen are passed, their attachments are looked up in one
+    cached batch, so selecting another row of the same table does not cost another query.
     """
-    
     try:
-        attachments = execute_sql(query, st.session_state.snowpark_session)
-        return attachments
+        attachments = get_incidents_attachments(
+            list(visible_incident_ids or []) + [incident_id], st.session_state.snowpark_session
+        )
+        if attachments.empty:
+            return attachments
+        return attachments[attachments["INCIDENT_NUMBER"] == incident_id].reset_index(drop=True)
     except Exception as e:
         st.error(f"Error fetching attachments: {str(e)}")
         return pd.DataFrame()
 
-def create_attachments_popover(incident_id, title):
+def create_attachments_popover(incident_id, title, visible_incident_ids: Optional[List[str]] = None):
     """Create a popover to display attachments for an incident"""
     with st.popover(f"📎 Attachments - {incident_id}", use_container_width=True):
         
         # Fetch attachments
-        attachments = get_incident_attachments(incident_id)
+        attachments = get_incident_attachments(incident_id, visible_incident_ids)
         
         if not attachments.empty:
             st.markdown(f"**Found {len(attachments)} attachment(s):**")
+
+            # Thumbnails for every attachment of the incident are fetched in one parallel batch
+            keys = [(attachment["ID"], str(attachment["UPLOADED_AT"])) for _, attachment in attachments.iterrows()]
+            thumbnails = get_attachment_cache().get_thumbnails(
+                st.session_state.snowpark_session,
+                list(zip(keys, attachments["ATTACHMENT_FILE"])),
+            )
             
             for idx, attachment in attachments.iterrows():
                 with st.container():
-                    img=st.session_state.snowpark_session.file.get_stream(attachment["ATTACHMENT_FILE"], decompress=False).read()
-
-                    st.image(img, width=300, use_container_width="never")
+                    key = keys[idx]
+                    if thumbnails.get(key) is not None:
+                        st.image(thumbnails[key], width=300)
+                    elif key in thumbnails:
+                        st.info("No preview available for this attachment.")
+                    else:
+                        st.warning("Attachment could not be loaded.")
 
                     st.caption(f"Uploaded: {attachment['UPLOADED_AT']}")
+
+                    # Full resolution is only fetched when asked for
+                    if st.toggle("🔍 Full resolution", key=f"attachment_full_{attachment['ID']}"):
+                        st.image(fetch_attachment_bytes(st.session_state.snowpark_session, attachment["ATTACHMENT_FILE"]))
                     
                     if idx < len(attachments) - 1:
                         st.markdown("---")
         else:
             st.info("No attachments found for this incident.")
 
-def create_active_incidents_table():
+def fetch_active_incidents(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch the top 5 active incidents with their latest comment"""
+    database = session.get_current_database()
+    schema = "gold_zone"
+    return execute_cached_sql(f"""
+            SELECT 
+                ai."INCIDENT_NUMBER", 
+                ai."TITLE", 
+                ai."PRIORITY", 
+                ai."STATUS", 
+                ai."CATEGORY", 
+                ai."CREATED_AT", 
+                ai."ASSIGNEE_ID",
+                ai."ASSIGNEE_NAME", 
+                ai."HAS_ATTACHMENTS",
+                ai."SOURCE_SYSTEM",
+                ai."EXTERNAL_SOURCE_ID",
+                lc."LATEST_COMMENT" as "LAST_COMMENT"
+            FROM {database}.{schema}.active_incidents ai 
+            LEFT JOIN {database}.{schema}.incident_latest_comment lc ON ai.incident_number = lc.incident_number
+            ORDER BY ai.created_at DESC 
+            LIMIT 5
+    """, session, ttl=60, depends_on=[f"{database}.{schema}.active_incidents", f"{database}.{schema}.incident_latest_comment"], cache=cache)
+
+
+def create_active_incidents_table(prefetched: Optional[Future] = None):
     """Create active incidents table"""
     
     st.subheader("🔄 Top 5 Active Incidents")
 
     try:
-        database = st.session_state.snowpark_session.get_current_database()
-        schema = "gold_zone"
-            # Convert to DataFrame
-        df = execute_sql(f"""
-                WITH latest_created_at AS (
-                    SELECT
-                        incident_number,
-                        MAX(created_at) AS latest_created_at
-                    FROM
-                        gold_zone.incident_comment_history
-                    GROUP BY
-                        incident_number
-                ),
-                latest_comments AS (
-                    SELECT
-                        ich.incident_number,
-                        ich.created_at,
-                        ich.content AS latest_comment
-                    FROM
-                        gold_zone.incident_comment_history AS ich
-                        INNER JOIN latest_created_at AS lc ON ich.incident_number = lc.incident_number
-                    AND ich.created_at = lc.latest_created_at
-                    ORDER BY
-                        ich.created_at DESC
-                )
-                SELECT 
-                    ai."INCIDENT_NUMBER", 
-                    ai."TITLE", 
-                    ai."PRIORITY", 
-                    ai."STATUS", 
-                    ai."CATEGORY", 
-                    ai."CREATED_AT", 
-                    ai."ASSIGNEE_ID",
-                    ai."ASSIGNEE_NAME", 
-                    ai."HAS_ATTACHMENTS",
-                    ai."SOURCE_SYSTEM",
-                    ai."EXTERNAL_SOURCE_ID",
-                    lc."LATEST_COMMENT" as "LAST_COMMENT"
-                FROM {database}.{schema}.active_incidents ai 
-                LEFT JOIN latest_comments lc ON ai.incident_number = lc.incident_number
-                ORDER BY ai.created_at DESC 
-                LIMIT 5
-        """, st.session_state.snowpark_session)
+        if prefetched is not None:
+            df = prefetched.result()
+        else:
+            df = fetch_active_incidents(st.session_state.snowpark_session)
     except Exception as e:
         df = pd.DataFrame()
 
@@ -621,35 +1432,47 @@ def create_active_incidents_table():
         
         if selected_incident['HAS_ATTACHMENTS']:
             st.markdown("### 📎 Attachments")
-            create_attachments_popover(selected_incident['INCIDENT_NUMBER'], selected_incident['TITLE'])
+            create_attachments_popover(
+                selected_incident['INCIDENT_NUMBER'],
+                selected_incident['TITLE'],
+                visible_incident_ids=df.loc[df["HAS_ATTACHMENTS"] == "📎", "INCIDENT_NUMBER"].tolist(),
+            )
+
+
+def fetch_recently_closed_incidents(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch the last 5 closed incidents"""
+    database = session.get_current_database()
+    schema = "gold_zone"
+
+    # Get last 5 closed incidents from the new closed_incidents model
+    query = f"""
+        SELECT 
+            incident_number,
+            title,
+            priority,
+            category,
+            status,
+            closed_at,
+            created_at,
+            total_resolution_hours,
+            source_system,
+            has_attachments
+        FROM {database}.{schema}.closed_incidents
+        ORDER BY closed_at DESC
+        LIMIT 5
+    """
+    return execute_cached_sql(query, session, ttl=300, depends_on=[f"{database}.{schema}.closed_incidents"], cache=cache)
 
 
-def create_recently_closed_incidents_table():
+def create_recently_closed_incidents_table(prefetched: Optional[Future] = None):
     """Display table of recently closed incidents"""
     st.subheader("🎯 Last known Closed Incidents")
 
     try:
-        database = st.session_state.snowpark_session.get_current_database()
-        schema = "gold_zone"
-
-        # Get last 5 closed incidents from the new closed_incidents model
-        query = f"""
-            SELECT 
-                incident_number,
-                title,
-                priority,
-                category,
-                status,
-                closed_at,
-                created_at,
-                total_resolution_hours,
-                source_system,
-                has_attachments
-            FROM {database}.{schema}.closed_incidents
-            ORDER BY closed_at DESC
-            LIMIT 5
-        """
-        closed_incidents = execute_sql(query, st.session_state.snowpark_session)
+        if prefetched is not None:
+            closed_incidents = prefetched.result()
+        else:
+            closed_incidents = fetch_recently_closed_incidents(st.session_state.snowpark_session)
     except Exception as e:
         closed_incidents = pd.DataFrame()
 
@@ -710,30 +1533,57 @@ def create_recently_closed_incidents_table():
         st.info("No recently closed incidents found.")
 
 
-def create_documents_processed_tab():
-    """Display documents processed in full and for Q&A"""
-    
-    database = st.session_state.snowpark_session.get_current_database()
+def fetch_full_documents(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch documents processed in full with their chunk counts"""
+    database = session.get_current_database()
     schema = "silver_zone"
+
+    # Query to get documents with chunk counts
+    full_docs_query = f"""
+        SELECT 
+            RELATIVE_PATH,
+            EXTENSION,
+            SIZE,
+            LAST_MODIFIED,
+            COUNT(*) as CHUNK_COUNT
+        FROM {database}.{schema}.document_full_extracts
+        GROUP BY RELATIVE_PATH, EXTENSION, SIZE, LAST_MODIFIED
+        ORDER BY LAST_MODIFIED DESC
+    """
+    return execute_cached_sql(full_docs_query, session, ttl=600, depends_on=[f"{database}.{schema}.document_full_extracts"], cache=cache)
+
+
+def fetch_qa_documents(session: Session, cache: Optional[QueryResultCache] = None) -> pd.DataFrame:
+    """Fetch documents processed for Q&A"""
+    database = session.get_current_database()
+    schema = "silver_zone"
+
+    # Query to get documents processed for Q&A
+    qa_docs_query = f"""
+        SELECT 
+            RELATIVE_PATH,
+            EXTENSION,
+            SIZE,
+            LAST_MODIFIED,
+            ANALYSIS_TYPE
+        FROM {database}.{schema}.document_question_extracts
+        ORDER BY LAST_MODIFIED DESC
+    """
+    return execute_cached_sql(qa_docs_query, session, ttl=600, depends_on=[f"{database}.{schema}.document_question_extracts"], cache=cache)
+
+
+def create_documents_processed_tab(full_docs_prefetched: Optional[Future] = None, qa_docs_prefetched: Optional[Future] = None):
+    """Display documents processed in full and for Q&A"""
     
     # Section 1: Documents Processed in Full
     st.markdown("### 📄 Documents Processed in Full")
     st.markdown("Documents that have been fully parsed and split into semantic chunks")
     
     try:
-        # Query to get documents with chunk counts
-        full_docs_query = f"""
-            SELECT 
-                RELATIVE_PATH,
-                EXTENSION,
-                SIZE,
-                LAST_MODIFIED,
-                COUNT(*) as CHUNK_COUNT
-            FROM {database}.{schema}.document_full_extracts
-            GROUP BY RELATIVE_PATH, EXTENSION, SIZE, LAST_MODIFIED
-            ORDER BY LAST_MODIFIED DESC
-        """
-        full_docs_df = execute_sql(full_docs_query, st.session_state.snowpark_session)
+        if full_docs_prefetched is not None:
+            full_docs_df = full_docs_prefetched.result()
+        else:
+            full_docs_df = fetch_full_documents(st.session_state.snowpark_session)
         
         if not full_docs_df.empty:
             # Format file size to be more readable
@@ -772,18 +1622,10 @@ def create_documents_processed_tab():
     st.markdown("Documents that have been analyzed for question extraction using AI")
     
     try:
-        # Query to get documents processed for Q&A
-        qa_docs_query = f"""
-            SELECT 
-                RELATIVE_PATH,
-                EXTENSION,
-                SIZE,
-                LAST_MODIFIED,
-                ANALYSIS_TYPE
-            FROM {database}.{schema}.document_question_extracts
-            ORDER BY LAST_MODIFIED DESC
-        """
-        qa_docs_df = execute_sql(qa_docs_query, st.session_state.snowpark_session)
+        if qa_docs_prefetched is not None:
+            qa_docs_df = qa_docs_prefetched.result()
+        else:
+            qa_docs_df = fetch_qa_documents(st.session_state.snowpark_session)
         
         if not qa_docs_df.empty:
             # Format file size to be more readable
@@ -817,6 +1659,67 @@ def create_documents_processed_tab():
         st.error(f"Error loading Q&A documents: {str(e)}")
 
 
+def prefetch_panels(session: Session) -> Dict[str, Future]:
+    """
+    Submit the queries of every independent panel to a bounded thread pool.
+
+    Snowpark sessions can run queries from several threads, so all panels share the app session.
+    Workers have no Streamlit script context, so everything they need is resolved up front.
+    """
+    cache = get_query_cache()
+    profile = metrics_profiling_enabled()
+    executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="panel_prefetch")
+    futures = {
+        "metrics": executor.submit(fetch_metrics, session, profile=profile, cache=cache),
+        "active_incidents": executor.submit(fetch_active_incidents, session, cache),
+        "closed_incidents": executor.submit(fetch_recently_closed_incidents, session, cache),
+        "full_documents": executor.submit(fetch_full_documents, session, cache),
+        "qa_documents": executor.submit(fetch_qa_documents, session, cache),
+        "monthly_trends": executor.submit(fetch_monthly_trends, session, cache),
+        "weekly_trends": executor.submit(fetch_weekly_trends, session, cache),
+        "incident_categories": executor.submit(fetch_incident_categories, session, cache),
+    }
+    # Queries keep running in the background; rendering waits on the futures
+    executor.shutdown(wait=False)
+    return futures
+
+
+def create_panel_skeleton(title: str):
+    """Placeholder displayed while the query of a panel is still running"""
+    st.markdown(f"""
+    <div style="
+        background: linear-gradient(90deg, #f3f4f6 0%, #e5e7eb 50%, #f3f4f6 100%);
+        padding: 25px; 
+        border-radius: 12px; 
+        min-height: 140px;
+        color: #9ca3af;
+        font-weight: 600;
+    ">
+        ⏳ Loading {title}...
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_panels_as_ready(panels: List[tuple]):
+    """
+    Render each panel into its placeholder as soon as all of its queries have completed.
+
+    Args:
+        panels: (placeholder, futures, render) tuples; render() is called inside the placeholder container
+    """
+    pending = list(panels)
+    while pending:
+        wait([f for _, futures, _ in pending for f in futures], return_when=FIRST_COMPLETED)
+        still_pending = []
+        for placeholder, futures, render in pending:
+            if all(f.done() for f in futures):
+                with placeholder.container():
+                    render()
+            else:
+                still_pending.append((placeholder, futures, render))
+        pending = still_pending
+
+
 def main():
 
     initialize_session_state()
@@ -868,30 +1771,74 @@ def main():
     # Create tabs
     tab1, tab2 = st.tabs(["📊 Dashboard", "📚 Documents Processed"])
     
-    with tab1:
-        # Key metrics
-        create_metrics_cards()
-        
-        st.markdown("<br><br>", unsafe_allow_html=True)
-        
-        # # Charts section
-        # create_charts()
-        
-        # st.markdown("<br>", unsafe_allow_html=True)
-        
-        
-        # Active incidents table
-        create_active_incidents_table()
+    if not PREFETCH_PANELS:
+        with tab1:
+            # Key metrics
+            create_metrics_cards()
+            
+            st.markdown("<br><br>", unsafe_allow_html=True)
+            
+            # Charts section
+            create_charts()
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            # Active incidents table
+            create_active_incidents_table()
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+
+            # Recently closed incidents table
+            create_recently_closed_incidents_table()
+            st.markdown("<br>", unsafe_allow_html=True)
         
-        st.markdown("<br>", unsafe_allow_html=True)
+        with tab2:
+            create_documents_processed_tab()
+            st.markdown("<br>", unsafe_allow_html=True)
+    else:
+        # Send all independent panel queries at once, then lay out one placeholder per panel
+        futures = prefetch_panels(st.session_state.snowpark_session)
 
-        # Recently closed incidents table
-        create_recently_closed_incidents_table()
-        st.markdown("<br>", unsafe_allow_html=True)
-    
-    with tab2:
-        create_documents_processed_tab()
-        st.markdown("<br>", unsafe_allow_html=True)
+        with tab1:
+            metrics_slot = st.empty()
+            st.markdown("<br><br>", unsafe_allow_html=True)
+            charts_slot = st.empty()
+            st.markdown("<br>", unsafe_allow_html=True)
+            active_incidents_slot = st.empty()
+            st.markdown("<br>", unsafe_allow_html=True)
+            closed_incidents_slot = st.empty()
+            st.markdown("<br>", unsafe_allow_html=True)
+
+        with tab2:
+            documents_slot = st.empty()
+            st.markdown("<br>", unsafe_allow_html=True)
+
+        if SHOW_PANEL_SKELETONS:
+            for slot, title in [
+                (metrics_slot, "metrics"),
+                (charts_slot, "charts"),
+                (active_incidents_slot, "active incidents"),
+                (closed_incidents_slot, "closed incidents"),
+                (documents_slot, "processed documents"),
+            ]:
+                with slot.container():
+                    create_panel_skeleton(title)
+
+        render_panels_as_ready([
+            (metrics_slot, [futures["metrics"]], lambda: create_metrics_cards(futures["metrics"])),
+            (
+                charts_slot,
+                [futures["monthly_trends"], futures["weekly_trends"], futures["incident_categories"]],
+                lambda: create_charts(futures["monthly_trends"], futures["weekly_trends"], futures["incident_categories"]),
+            ),
+            (active_incidents_slot, [futures["active_incidents"]], lambda: create_active_incidents_table(futures["active_incidents"])),
+            (closed_incidents_slot, [futures["closed_incidents"]], lambda: create_recently_closed_incidents_table(futures["closed_incidents"])),
+            (
+                documents_slot,
+                [futures["full_documents"], futures["qa_documents"]],
+                lambda: create_documents_processed_tab(futures["full_documents"], futures["qa_documents"]),
+            ),
+        ])
 
     # Footer with refresh
     st.markdown("---")
@@ -901,6 +1848,7 @@ def main():
         st.caption(f"📅 Last updated: {current_time}")
     with col2:
         if st.button("🔄 Refresh Data", type="secondary"):
+            get_query_cache().invalidate()
             st.rerun()
 
 if __name__ == "__main__":